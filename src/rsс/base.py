@@ -1,10 +1,62 @@
 import pathlib
-from os import PathLike
+from collections.abc import Sequence
 from typing import Union
 from datetime import datetime
+from types import MappingProxyType
 
+try:
+    from ciso8601 import parse_datetime as _fastiso
+except ImportError:
+    _fastiso = None
 
-class Path(PathLike):
+_dt = datetime
+_fromiso = datetime.fromisoformat
+_fromts = datetime.fromtimestamp
+
+# Windows flavour is used on every platform on purpose: it understands
+# both separators and drive letters, and as_win() depends on it.
+_PurePath = pathlib.PureWindowsPath
+
+
+def _parse_iso(value: str) -> datetime:
+    """
+    Parses an ISO 8601 string, using ciso8601 if it is installed.
+    """
+    if _fastiso is not None:
+        try:
+            return _fastiso(value)
+        except ValueError:
+            pass
+    if value.endswith('Z'):
+        value = value[:-1] + '+00:00'
+    return _fromiso(value)
+
+
+_DT_CONVERTERS = MappingProxyType({
+    datetime: lambda value: value,
+    int: _fromts,
+    float: _fromts,
+    str: _parse_iso,
+})
+
+
+def _coerce_dt(value: Union[str, int, float, datetime]) -> datetime:
+    """
+    Converts a timestamp, an ISO 8601 string or a datetime object
+    to a datetime object.
+    """
+    converter = _DT_CONVERTERS.get(type(value))
+    if converter is not None:
+        return converter(value)
+    # Subclasses (bool, datetime subclasses etc.) aren't in the mapping
+    if isinstance(value, _dt):
+        return value
+    if isinstance(value, (int, float)):
+        return _fromts(value)
+    return _parse_iso(str(value))
+
+
+class Path:
     """
     Class for working with paths and path-like objects.
     This were created because default Path lib has pretty low
@@ -16,17 +68,92 @@ class Path(PathLike):
     root and others as additional paths.
     So joining '/debian' to the '/home/' (Path('/home/', '/debian')
     will result to '/home/debian'.
+    Path doesn't inherit os.PathLike, because the base class would add
+    a __dict__ to every instance. It still passes isinstance checks
+    against os.PathLike, as it implements __fspath__.
     """
 
-    __slots__ = ['as_posix', 'drive', 'root', 'anchor', 'name', 'suffix',
-                 'suffixes', 'stem', 'with_name', 'with_suffix',
-                 'relative_to', 'parts', 'joinpath', 'is_absolute',
-                 'is_reserved', 'match']
+    __slots__ = ('_path', '_as_posix_cache')
 
     def __init__(self, *args):
-        self._path = pathlib.PureWindowsPath(*args)
-        for member in self.__slots__:
-            setattr(self, member, getattr(self._path, member))
+        if len(args) == 1:
+            if isinstance(args[0], Path):
+                self._path = args[0]._path
+                self._as_posix_cache = args[0]._as_posix_cache
+                return
+            if type(args[0]) is _PurePath:
+                self._path = args[0]
+                self._as_posix_cache = None
+                return
+        self._path = _PurePath(*args)
+        self._as_posix_cache = None
+
+    @classmethod
+    def _wrap(cls, path: _PurePath):
+        """
+        Creates an object around an already parsed path
+        without running it through the constructor again.
+        """
+        obj = object.__new__(cls)
+        obj._path = path
+        obj._as_posix_cache = None
+        return obj
+
+    @property
+    def drive(self):
+        return self._path.drive
+
+    @property
+    def root(self):
+        return self._path.root
+
+    @property
+    def anchor(self):
+        return self._path.anchor
+
+    @property
+    def name(self):
+        return self._path.name
+
+    @property
+    def suffix(self):
+        return self._path.suffix
+
+    @property
+    def suffixes(self):
+        return self._path.suffixes
+
+    @property
+    def stem(self):
+        return self._path.stem
+
+    @property
+    def parts(self):
+        return self._path.parts
+
+    def as_posix(self):
+        return self.__fspath__()
+
+    def with_name(self, *args, **kwargs):
+        return self._path.with_name(*args, **kwargs)
+
+    def with_suffix(self, *args, **kwargs):
+        return self._path.with_suffix(*args, **kwargs)
+
+    def relative_to(self, *args, **kwargs):
+        return self._path.relative_to(*args, **kwargs)
+
+    def joinpath(self, *args, **kwargs):
+        return self._path.joinpath(*args, **kwargs)
+
+    def is_absolute(self):
+        return self._path.is_absolute()
+
+    def is_reserved(self):
+        return self._path.is_reserved()
+
+    def match(self, *args, **kwargs):
+        return self._path.match(*args, **kwargs)
 
     def mkdir(self, mode=0o777, parents=False, exist_ok=False):
         return pathlib.Path(self._path.as_posix()).\
@@ -34,31 +161,99 @@ class Path(PathLike):
 
     @property
     def parent(self):
-        return self.__class__(self._path.parent)
+        return self._wrap(self._path.parent)
 
     @property
     def parents(self):
-        parents = self._path.parents
-        result = []
-        for parent in parents:
-            if str(parent) != '.':
-                result.append(self.__class__(parent))
-        return result
+        return _PathParents(self)
 
     def as_win(self):
         return str(self._path)
 
+    def __truediv__(self, other):
+        if isinstance(other, Path):
+            other = other._path
+        return self._wrap(self._path / other)
+
     def __str__(self):
         return self.as_win()
 
     def __repr__(self):
-        return f'Path({self._path.as_posix()})'
+        return f'Path({self.__fspath__()})'
 
     def __fspath__(self):
-        return self.as_posix()
+        result = self._as_posix_cache
+        if result is None:
+            result = self._as_posix_cache = self._path.as_posix()
+        return result
+
+
+def _as_path(path: Union[str, Path]) -> Path:
+    """
+    Returns the path as a Path object. Path objects (including ones of
+    Path subclasses) are returned as they are.
+    """
+    return path if isinstance(path, Path) else Path(path)
+
+
+class _PathParents(Sequence):
+    """
+    Sequence of the logical ancestors of a Path, the nearest one going
+    first. Ancestors are wrapped into Path objects only when accessed.
+    Slices and comparisons behave as those of the list Path.parents
+    used to return.
+    """
+
+    __slots__ = ('_parents', '_length', '_wrap')
+    __hash__ = None
+
+    def __init__(self, path: Path):
+        self._parents = path._path.parents
+        self._wrap = path._wrap
+        self._length = len(self._parents)
+        # The last ancestor of a relative path is '.', which is skipped
+        if self._length and not path._path.anchor:
+            self._length -= 1
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._length))]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError(index)
+        return self._wrap(self._parents[index])
+
+    def __eq__(self, other):
+        if isinstance(other, (list, _PathParents)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return f'[{", ".join(repr(parent) for parent in self)}]'
+
+
+class FileType:
+    """
+    Integer tags of the file types supported by FileAttributes.
+    """
+    FILE = 0
+    DIRECTORY = 1
+    SYMLINK = 2
+
+    _MAP = {'file': FILE, 'directory': DIRECTORY, 'symlink': SYMLINK}
+    _NAMES = ('file', 'directory', 'symlink')
 
 
 class FileAttributes:
+
+    __slots__ = ('_name', '_size', '_type_tag', '_path', '_absolute_path',
+                 '_modification_time', '_last_access_time', '_create_time',
+                 '_key_cache')
+
     def __init__(self, name: str, size: int, type: str, path: Union[str, Path],
                  absolute_path: Union[str, Path],
                  modification_time: Union[str, datetime],
@@ -83,39 +278,78 @@ class FileAttributes:
             Time of the last access to the file
         create_time: [str, datetime]
             When the file was created
+
+        Timestamps can be passed as datetime objects, POSIX timestamps or
+        ISO 8601 strings. The last two are turned into datetime objects
+        only when the attribute is read for the first time.
         """
-        self.name = name
-        self.size = int(size)
-        if type not in ['directory', 'file', 'symlink']:
-            raise ValueError(f"Type must be either 'directory', "
-                             f"'file', or 'symlink' (got {type}).")
+        self._name = name
+        self._size = int(size)
         self.type = type
-        self.path = Path(path)
-        self.absolute_path = Path(absolute_path)
-
-        if not isinstance(modification_time, datetime):
-            if isinstance(modification_time, (float, int)):
-                modification_time = datetime.\
-                    fromtimestamp(modification_time)
-            else:
-                modification_time = datetime.\
-                    fromisoformat(str(modification_time))
-        self.modification_time = modification_time
-
-        if not isinstance(last_access_time, datetime):
-            if isinstance(last_access_time, (float, int)):
-                last_access_time = datetime.fromtimestamp(last_access_time)
-            else:
-                last_access_time = datetime.\
-                    fromisoformat(str(last_access_time))
-        self.last_access_time = last_access_time
-
-        if not isinstance(create_time, datetime) and create_time is not None:
-            if isinstance(create_time, (float, int)):
-                create_time = datetime.fromtimestamp(create_time)
-            else:
-                create_time = datetime.fromisoformat(str(create_time))
-        self.create_time = create_time
+        if path is absolute_path or path == absolute_path:
+            self._path = self._absolute_path = _as_path(absolute_path)
+        else:
+            self._path = _as_path(path)
+            self._absolute_path = _as_path(absolute_path)
+
+        self._modification_time = modification_time
+        self._last_access_time = last_access_time
+        self._create_time = create_time
+        self._key_cache = None
+
+    @classmethod
+    def from_row(cls, name: str, size: int, type: str,
+                 path: Union[str, Path], absolute_path: Union[str, Path],
+                 modification_time: Union[str, int, float, datetime],
+                 last_access_time: Union[str, int, float, datetime],
+                 create_time: Union[str, int, float, datetime] = None):
+        """
+        Creates an object from positional values, skipping the validation
+        done in the constructor. It's meant for connections building
+        many objects from data they trust (e.g. directory listings).
+        Parameters are the same as in the constructor.
+
+        Returns
+        -------
+        FileAttributes
+            New FileAttributes object.
+        """
+        self = object.__new__(cls)
+        self._name = name
+        self._size = size
+        self._type_tag = FileType._MAP[type]
+        self._path = _as_path(path)
+        if absolute_path is path:
+            self._absolute_path = self._path
+        else:
+            self._absolute_path = _as_path(absolute_path)
+        self._modification_time = modification_time
+        self._last_access_time = last_access_time
+        self._create_time = create_time
+        self._key_cache = None
+        return self
+
+    @classmethod
+    def from_dict(cls, attributes: dict):
+        """
+        Creates an object from a dictionary made by to_dict().
+
+        Parameters
+        ----------
+        attributes: dict
+            FileAttributes dictionary representation.
+
+        Returns
+        -------
+        FileAttributes
+            New FileAttributes object.
+        """
+        return cls.from_row(attributes['name'], attributes['size'],
+                            attributes['type'], attributes['path'],
+                            attributes['absolute_path'],
+                            attributes['modification_time'],
+                            attributes['last_access_time'],
+                            attributes.get('create_time'))
 
     def to_dict(self):
         """
@@ -126,27 +360,137 @@ class FileAttributes:
         dict
             FileAttributes dictionary representation.
         """
-        result = dict(vars(self))
-        result['path'] = result['path'].as_posix()
-        result['absolute_path'] = result['absolute_path'].as_posix()
-        return result
+        return {
+            'name': self.name,
+            'size': self.size,
+            'type': self.type,
+            'path': self.path.__fspath__(),
+            'absolute_path': self.absolute_path.__fspath__(),
+            'modification_time': self.modification_time,
+            'last_access_time': self.last_access_time,
+            'create_time': self.create_time,
+        }
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @name.setter
+    def name(self, value: str):
+        self._name = value
+        self._key_cache = None
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @size.setter
+    def size(self, value: int):
+        self._size = int(value)
+        self._key_cache = None
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    @path.setter
+    def path(self, value: Union[str, Path]):
+        self._path = _as_path(value)
+        self._key_cache = None
+
+    @property
+    def absolute_path(self) -> Path:
+        return self._absolute_path
+
+    @absolute_path.setter
+    def absolute_path(self, value: Union[str, Path]):
+        self._absolute_path = _as_path(value)
+        self._key_cache = None
+
+    @property
+    def modification_time(self) -> datetime:
+        value = self._modification_time
+        if not isinstance(value, _dt):
+            value = self._modification_time = _coerce_dt(value)
+        return value
+
+    @modification_time.setter
+    def modification_time(self, value: Union[str, int, float, datetime]):
+        self._modification_time = value
+        self._key_cache = None
+
+    @property
+    def last_access_time(self) -> datetime:
+        value = self._last_access_time
+        if not isinstance(value, _dt):
+            value = self._last_access_time = _coerce_dt(value)
+        return value
+
+    @last_access_time.setter
+    def last_access_time(self, value: Union[str, int, float, datetime]):
+        self._last_access_time = value
+        self._key_cache = None
+
+    @property
+    def create_time(self) -> datetime:
+        value = self._create_time
+        if value is not None and not isinstance(value, _dt):
+            value = self._create_time = _coerce_dt(value)
+        return value
+
+    @create_time.setter
+    def create_time(self, value: Union[str, int, float, datetime]):
+        self._create_time = value
+        self._key_cache = None
+
+    @property
+    def _key(self) -> tuple:
+        # Used by __eq__ and __hash__, the setters of the attributes
+        # reset it.
+        key = self._key_cache
+        if key is None:
+            key = self._key_cache = (
+                self._name, self._size, self._type_tag,
+                self._path.__fspath__(), self._absolute_path.__fspath__(),
+                self.modification_time, self.last_access_time,
+                self.create_time
+            )
+        return key
+
+    @property
+    def type(self) -> str:
+        return FileType._NAMES[self._type_tag]
+
+    @type.setter
+    def type(self, value: str):
+        type_tag = FileType._MAP.get(value)
+        if type_tag is None:
+            raise ValueError(f"Type must be either 'directory', "
+                             f"'file', or 'symlink' (got {value}).")
+        self._type_tag = type_tag
+        self._key_cache = None
 
     def is_directory(self):
-        return self.type == 'directory'
+        return self._type_tag == FileType.DIRECTORY
 
     def is_file(self):
-        return self.type == 'file'
+        return self._type_tag == FileType.FILE
 
     def is_symlink(self):
-        return self.type == 'symlink'
+        return self._type_tag == FileType.SYMLINK
 
     def __getitem__(self, item):
         return getattr(self, item)
 
     def __iter__(self):
-        dict = self.to_dict()
-        for key, value in dict.items():
-            yield key, value
+        yield 'name', self.name
+        yield 'size', self.size
+        yield 'type', self.type
+        yield 'path', self.path.__fspath__()
+        yield 'absolute_path', self.absolute_path.__fspath__()
+        yield 'modification_time', self.modification_time
+        yield 'last_access_time', self.last_access_time
+        yield 'create_time', self.create_time
 
     def __repr__(self):
         return f"rsc.base.FileAttributes['{self.absolute_path}']"
@@ -154,5 +498,14 @@ class FileAttributes:
     def __eq__(self, other):
         if not isinstance(other, self.__class__):
             return False
-        return self.to_dict() == other.to_dict()
+        return self._key == other._key
+
+    def __hash__(self):
+        return hash(self._key)
+
+    def __copy__(self):
+        copied = object.__new__(self.__class__)
+        for slot in FileAttributes.__slots__:
+            setattr(copied, slot, getattr(self, slot))
+        return copied
 
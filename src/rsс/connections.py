@@ -1,10 +1,28 @@
 import os
+import codecs
+import asyncio
+import hashlib
+import inspect
+import queue
+import shlex
+import sys
 import socket
-from typing import Union, IO, BinaryIO
+import tarfile
+import threading
+from copy import copy
+from time import monotonic
+from functools import partial
+from operator import attrgetter
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import (Union, IO, BinaryIO, Callable, Iterator,
+                    ContextManager)
 from abc import abstractmethod, ABCMeta
-from stat import S_ISDIR
-from datetime import datetime
-from io import IOBase, StringIO, BytesIO
+from stat import S_ISDIR, S_ISREG
+from types import MappingProxyType
+from tempfile import SpooledTemporaryFile
+from io import (IOBase, RawIOBase, BufferedIOBase, StringIO, BytesIO,
+                UnsupportedOperation)
 
 import avmwc
 import paramiko
@@ -14,7 +32,283 @@ from smb.smb_structs import OperationFailure
 
 from .exceptions import (NotPerformedException, FileNotFound,
                          ConnectionFailure, FileExists)
-from .base import FileAttributes, Path
+from .base import FileAttributes, Path, _as_path
+
+
+# Buffer size of local files opened for transfers
+_LOCAL_BUFFER_SIZE = 1 << 20
+# Size of data open_remote() keeps in memory before using a temporary file
+_SPOOL_SIZE = 8 << 20
+# Number of entries in the stat cache after which expired ones are purged
+_STAT_CACHE_PURGE_SIZE = 4096
+# Upper limit of SMB2 read/write/transaction sizes used by default
+_SMB_MAX_IO_SIZE = 8 << 20
+# Names of the directory itself and of its parent found in listings
+_SPECIAL_NAMES = frozenset(('.', '..'))
+# SSH window size used by default, large enough for the bandwidth-delay
+# product of fast links with high latency
+_SSH_WINDOW_SIZE = 1 << 27
+# Maximum length of shell commands made of many paths, way below ARG_MAX
+_SSH_COMMAND_SIZE = 1 << 16
+# Directory modes of SSHConnection written as decimal numbers looking
+# like octal ones (e.g. 644), and their permission bits
+_POSIX_MODES = MappingProxyType({
+    666: 0o666,
+    660: 0o660,
+    644: 0o644,
+    600: 0o600,
+    777: 0o777,
+    700: 0o700,
+    70: 0o070,
+})
+# Largest number of bytes copied by one kernel copy call
+_KERNEL_COPY_SIZE = 1 << 30
+# Whether paramiko (3.3+) can limit the read requests a prefetch keeps
+# in flight, for SFTPFile.prefetch() and SFTPClient.get()
+_SFTP_PREFETCH_LIMIT = 'max_concurrent_requests' in \
+    inspect.signature(paramiko.SFTPFile.prefetch).parameters
+_SFTP_GET_PREFETCH_LIMIT = 'max_concurrent_prefetch_requests' in \
+    inspect.signature(paramiko.SFTPClient.get).parameters
+# Fields of smb.base.SharedFile used to build FileAttributes
+_shared_file_fields = attrgetter('filename', 'file_size', 'isDirectory',
+                                 'last_write_time', 'last_access_time',
+                                 'create_time')
+
+
+class _ResolvedPath(Path):
+    """
+    Path which already has the working directory of a connection applied.
+    Connections return such paths (e.g. in listings) and don't apply the
+    working directory to them again when they are passed back.
+    """
+
+    __slots__ = ()
+
+
+def _copy_stream(source: IO, destination: IO,
+                 chunk_size: int = _LOCAL_BUFFER_SIZE,
+                 callback: Callable = None) -> int:
+    """
+    Copies data from one binary file object to another by chunks of
+    chunk_size bytes. callback (if passed) is called with the number
+    of bytes copied so far after every chunk.
+
+    Returns
+    ----------
+    int
+        Number of bytes copied.
+    """
+    read = source.read
+    write = destination.write
+    size = 0
+    while True:
+        data = read(chunk_size)
+        if not data:
+            return size
+        write(data)
+        size += len(data)
+        if callback is not None:
+            callback(size)
+
+
+def _file_descriptors(source: IO, destination: IO) -> tuple:
+    """
+    Returns file descriptors of both objects if they are regular files
+    on disk, otherwise None.
+    """
+    try:
+        descriptors = source.fileno(), destination.fileno()
+    except (AttributeError, OSError, UnsupportedOperation):
+        return None
+    for descriptor in descriptors:
+        if not S_ISREG(os.fstat(descriptor).st_mode):
+            return None
+    return descriptors
+
+
+def _copy_file_range(source_descriptor: int, destination_descriptor: int,
+                     offset: int) -> int:
+    return os.copy_file_range(source_descriptor, destination_descriptor,
+                              _KERNEL_COPY_SIZE, offset)
+
+
+def _sendfile(source_descriptor: int, destination_descriptor: int,
+              offset: int) -> int:
+    return os.sendfile(destination_descriptor, source_descriptor, offset,
+                       _KERNEL_COPY_SIZE)
+
+
+# Ways of copying data between regular files inside the kernel, the
+# preferred one going first. copy_file_range() (Linux 4.5+) can clone
+# blocks on file systems supporting reflinks, sendfile() copies between
+# regular files only on Linux.
+_KERNEL_COPIES = tuple(
+    copy for copy, available in (
+        (_copy_file_range, hasattr(os, 'copy_file_range')),
+        (_sendfile, hasattr(os, 'sendfile')),
+    ) if available and sys.platform.startswith('linux')
+)
+
+
+def _copy_file(source: IO, destination: IO,
+               chunk_size: int = _LOCAL_BUFFER_SIZE) -> int:
+    """
+    Copies the rest of the source to the destination. Data of regular
+    files is copied inside the kernel (see _KERNEL_COPIES) where it's
+    possible, other objects are copied by _copy_stream().
+
+    Returns
+    ----------
+    int
+        Number of bytes copied.
+    """
+    descriptors = _file_descriptors(source, destination) \
+        if _KERNEL_COPIES else None
+    if descriptors is None:
+        return _copy_stream(source, destination, chunk_size)
+
+    # Data already buffered by the objects has to go first
+    destination.flush()
+    source_descriptor, destination_descriptor = descriptors
+    start = offset = source.tell()
+    for copy in _KERNEL_COPIES:
+        try:
+            while True:
+                copied = copy(source_descriptor, destination_descriptor,
+                              offset)
+                if not copied:
+                    break
+                offset += copied
+        except OSError:
+            # e.g. the file system or the kernel doesn't support the call
+            if offset != start:
+                raise
+            continue
+        # Nothing copied may also mean a file which reports no size
+        # (e.g. in /proc), the next way is tried then
+        if offset != start:
+            # Leave both objects at the end of the copied data, as
+            # reading and writing them would
+            source.seek(offset)
+            destination.seek(0, os.SEEK_CUR)
+            return offset - start
+    return _copy_stream(source, destination, chunk_size)
+
+
+def _stat_to_fileattributes(stats, path: Path,
+                            absolute_path: Path) -> FileAttributes:
+    """
+    Builds FileAttributes of a file from its os.stat_result or
+    paramiko.SFTPAttributes. Timestamps are turned into datetime
+    objects by FileAttributes when they are read.
+    """
+    return FileAttributes.from_row(
+        path.name, stats.st_size,
+        'directory' if S_ISDIR(stats.st_mode) else 'file',
+        path, absolute_path, stats.st_mtime, stats.st_atime,
+        getattr(stats, 'st_ctime', None)
+    )
+
+
+def _advise_sequential(file_object: IO):
+    """
+    Tells the kernel that the local file is going to be read from start
+    to end, so it reads ahead more aggressively. It's only a hint, which
+    is skipped where posix_fadvise() isn't available.
+    """
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    try:
+        os.posix_fadvise(file_object.fileno(), 0, 0,
+                         os.POSIX_FADV_SEQUENTIAL)
+    except OSError:
+        pass
+
+
+class _TextIOReader(RawIOBase):
+    """
+    Binary file-like object which gives contents of a text IO object
+    encoded to UTF-8, encoding only as much text as is being read.
+    Reading starts from the current position of the text IO object,
+    seek(0) goes to the start of its text.
+    """
+
+    def __init__(self, text_io: StringIO):
+        self._text = text_io.getvalue()
+        # Positions of StringIO are indexes of characters
+        self._position = text_io.tell()
+        self._pending = b''
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        # Only rewinding is supported, as byte offsets of the text are
+        # unknown until it's encoded.
+        if offset != 0 or whence != os.SEEK_SET:
+            raise UnsupportedOperation('only seek(0) is supported')
+        self._position = 0
+        self._pending = b''
+        return 0
+
+    def readinto(self, buffer) -> int:
+        size = len(buffer)
+        text = self._text
+        # Every character is encoded separately in UTF-8, so slices of
+        # the text can be encoded one after another.
+        while len(self._pending) < size and self._position < len(text):
+            chunk = text[self._position:self._position + size]
+            self._position += len(chunk)
+            self._pending += chunk.encode('utf-8')
+        data = self._pending[:size]
+        self._pending = self._pending[size:]
+        buffer[:len(data)] = data
+        return len(data)
+
+
+class _CountingReader(RawIOBase):
+    """
+    Binary file-like object reading another one and counting the bytes
+    read from it.
+    """
+
+    def __init__(self, file_object: IO):
+        self._file_object = file_object
+        self.size = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer) -> int:
+        size = self._file_object.readinto(buffer) or 0
+        self.size += size
+        return size
+
+
+class _TextIOWriter(RawIOBase):
+    """
+    Binary file-like object which decodes UTF-8 bytes written to it as
+    they come and puts the text into a text IO object.
+    """
+
+    def __init__(self, text_io: StringIO):
+        self._text_io = text_io
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+
+    def writable(self):
+        return True
+
+    def write(self, data) -> int:
+        self._text_io.write(self._decoder.decode(data))
+        return len(data)
+
+    def close(self):
+        if not self.closed:
+            self._text_io.write(self._decoder.decode(b'', final=True))
+        super().close()
 
 
 class RemoteStorageConnection(metaclass=ABCMeta):
@@ -26,9 +320,24 @@ class RemoteStorageConnection(metaclass=ABCMeta):
     ----------
     _connection: Any
         Main object which is used to operate files on a remote storage.
+    stat_cache_ttl: float
+        How long (in seconds) the results of existence checks and
+        attributes requests are reused. It's 2 seconds by default, so
+        changes made by other clients (or other connection objects) may
+        be seen by file_exists() and get_file_attributes() only after
+        that long. Changes made through the connection itself are seen
+        at once. 0 disables the cache.
+    chunk_size: int
+        Size of chunks (in bytes) data is copied by when a connection
+        moves it between file objects itself.
     """
 
     _connection = None
+    stat_cache_ttl = 2.0
+    chunk_size = _LOCAL_BUFFER_SIZE
+    _stat_cache = None
+    _known_dirs = None
+    _work_dir_cache = None
 
     @abstractmethod
     def __init__(self, remote_ip: str, username: str, password: str,
@@ -49,6 +358,11 @@ class RemoteStorageConnection(metaclass=ABCMeta):
         work_dir: Union[str, Path]
             Working directory, i.e. the root place which will be
             added to the absolute path of a file.
+
+        Existence checks and attributes of files are cached for
+        stat_cache_ttl seconds (2 by default), so changes made by others
+        may be noticed only after that. Setting stat_cache_ttl to 0
+        on the object makes every check ask the storage.
         """
         self._work_dir = work_dir
 
@@ -72,6 +386,161 @@ class RemoteStorageConnection(metaclass=ABCMeta):
     def work_dir(self, work_dir: Union[str, Path]):
         self._work_dir = work_dir
 
+    def _join_posix(self, remote_path: Union[str, Path]) -> str:
+        """
+        Returns the POSIX form of the path with the working directory
+        applied, i.e. Path(self.work_dir, remote_path).as_posix().
+        Plain relative paths are joined as strings, anything else (drives,
+        absolute paths, backslashes, dot components) goes through Path.
+        Resolved paths are returned as they are.
+        """
+        if isinstance(remote_path, _ResolvedPath):
+            return remote_path.__fspath__()
+        cached = self._work_dir_cache
+        if cached is None or cached[0] is not self._work_dir:
+            cached = self._work_dir_cache = \
+                (self._work_dir, Path(self._work_dir).as_posix())
+        work_dir = cached[1]
+        if isinstance(remote_path, Path):
+            remote_path = remote_path.__fspath__()
+        if type(remote_path) is str:
+            if not remote_path:
+                return work_dir
+            if '\\' not in remote_path and ':' not in remote_path \
+                    and '//' not in remote_path \
+                    and '/.' not in '/' + remote_path \
+                    and remote_path[0] != '/' and remote_path[-1] != '/' \
+                    and work_dir[-1] != ':':
+                if work_dir == '.':
+                    return remote_path
+                if work_dir[-1] == '/':
+                    return work_dir + remote_path
+                return f'{work_dir}/{remote_path}'
+        return Path(self._work_dir, remote_path).as_posix()
+
+    def _resolve(self, remote_path: Union[str, Path]) -> Path:
+        """
+        Applies the working directory to the path exactly once.
+        """
+        if isinstance(remote_path, _ResolvedPath):
+            return remote_path
+        return self._posix_to_path(self._join_posix(remote_path))
+
+    def _absolute_path(self, remote_path: Union[str, Path]) -> Path:
+        """
+        Returns the path with the working directory applied. Paths made
+        by _resolve() (and paths derived from them) already have it,
+        so they are returned as they are instead of being joined again.
+        """
+        if isinstance(remote_path, _ResolvedPath):
+            return remote_path
+        return Path(self._work_dir, remote_path)
+
+    @staticmethod
+    def _posix_to_path(posix_path: str) -> Path:
+        """
+        Turns a POSIX path made by _join_posix() into a resolved Path.
+        """
+        resolved_path = _ResolvedPath(posix_path)
+        resolved_path._as_posix_cache = posix_path
+        return resolved_path
+
+    def _stat_cache_get(self, remote_file_path: Union[str, Path]):
+        """
+        Returns an (exists, attributes) tuple cached for the resolved
+        remote path (or its POSIX form) or None if there is no fresh
+        entry. Attributes can be None if only the existence
+        of the file is known.
+        """
+        if not self._stat_cache:
+            return None
+        key = remote_file_path if type(remote_file_path) is str \
+            else remote_file_path.as_posix()
+        entry = self._stat_cache.get(key)
+        if entry is None:
+            return None
+        expires_at, exists, attributes = entry
+        if expires_at < monotonic():
+            self._stat_cache.pop(key, None)
+            return None
+        return exists, attributes
+
+    def _stat_cache_put(self, remote_file_path: Union[str, Path],
+                        exists: bool,
+                        attributes: FileAttributes = None):
+        """
+        Remembers whether the resolved remote path exists and,
+        optionally, its attributes.
+        """
+        if self.stat_cache_ttl <= 0:
+            return
+        now = monotonic()
+        if self._stat_cache is None:
+            self._stat_cache = {}
+        elif len(self._stat_cache) > _STAT_CACHE_PURGE_SIZE:
+            for key, entry in list(self._stat_cache.items()):
+                if entry[0] < now:
+                    self._stat_cache.pop(key, None)
+        key = remote_file_path if type(remote_file_path) is str \
+            else remote_file_path.as_posix()
+        self._stat_cache[key] = (now + self.stat_cache_ttl, exists, attributes)
+
+    def _stat_cache_invalidate(self, remote_file_path: Path,
+                               recursive: bool = False):
+        """
+        Forgets the cached state of the resolved remote path and,
+        if recursive is set, of everything inside it.
+        """
+        key = remote_file_path.as_posix()
+        if recursive and self._known_dirs:
+            self._forget_directories(key)
+        if not self._stat_cache:
+            return
+        self._stat_cache.pop(key, None)
+        if recursive:
+            prefix = key.rstrip('/') + '/'
+            for cached_key in list(self._stat_cache):
+                if cached_key.startswith(prefix):
+                    self._stat_cache.pop(cached_key, None)
+
+    def _remember_directory(self, posix_path: str):
+        """
+        Remembers for stat_cache_ttl seconds that the directory with the
+        resolved POSIX path exists, so that create_directory() stops
+        scanning parents at it. The memo is also cleared when the
+        directory is deleted through the connection.
+        """
+        if self.stat_cache_ttl <= 0:
+            return
+        if self._known_dirs is None:
+            self._known_dirs = {}
+        self._known_dirs[posix_path] = monotonic() + self.stat_cache_ttl
+
+    def _is_known_directory(self, posix_path: str) -> bool:
+        """
+        Tells whether the directory is remembered and the memo
+        hasn't expired yet.
+        """
+        if not self._known_dirs:
+            return False
+        expires_at = self._known_dirs.get(posix_path)
+        if expires_at is None:
+            return False
+        if expires_at < monotonic():
+            # Another thread may have dropped it already
+            self._known_dirs.pop(posix_path, None)
+            return False
+        return True
+
+    def _forget_directories(self, posix_path: str):
+        """
+        Forgets the remembered directory and everything inside it.
+        """
+        prefix = posix_path.rstrip('/') + '/'
+        for known in list(self._known_dirs):
+            if known == posix_path or known.startswith(prefix):
+                self._known_dirs.pop(known, None)
+
     def send_file_object(self, file_object: BinaryIO,
                          remote_path_to_save: Union[str, Path],
                          create_parents: bool = None, **kwargs):
@@ -90,14 +559,25 @@ class RemoteStorageConnection(metaclass=ABCMeta):
             missing path directories in the path or not.
 
         """
+        return self._send(self._send_file_object, remote_path_to_save,
+                          create_parents, file_object=file_object, **kwargs)
+
+    def _send(self, send: Callable, remote_path_to_save: Union[str, Path],
+              create_parents: bool = None, **kwargs):
+        """
+        Calls send(remote_path_to_save=..., **kwargs) with the resolved
+        remote path, creating its parents first if asked to. The path
+        is dropped from the stat cache afterwards.
+        """
+        remote_path_to_save = self._resolve(remote_path_to_save)
         if create_parents:
-            self.create_directory(remote_path_to_save,
+            self.create_directory(remote_path_to_save.parent,
                                   create_parents=create_parents,
                                   exist_ok=True)
-        remote_path_to_save = Path(self.work_dir, remote_path_to_save)
-        return self._send_file_object(file_object=file_object,
-                                      remote_path_to_save=remote_path_to_save,
-                                      **kwargs)
+        try:
+            return send(remote_path_to_save=remote_path_to_save, **kwargs)
+        finally:
+            self._stat_cache_invalidate(remote_path_to_save)
 
     @abstractmethod
     def _send_file_object(self, file_object: BinaryIO,
@@ -116,6 +596,29 @@ class RemoteStorageConnection(metaclass=ABCMeta):
         """
         raise NotImplementedError()
 
+    def _send_file_path(self, local_file_path: Union[str, os.PathLike],
+                        remote_path_to_save: Path, **kwargs):
+        """
+        Sends a local file to a remote server. By default the file is
+        opened here and sent with _send_file_object(), connections which
+        can transfer files by their paths should override it.
+
+        Parameters
+        ----------
+        local_file_path: Union[str, os.PathLike]
+            Path to the file on the local machine to send.
+        remote_path_to_save: Path
+            Remote path of a file which will be used to put data into.
+        """
+        with open(local_file_path, 'rb',
+                  buffering=_LOCAL_BUFFER_SIZE) as file_object:
+            _advise_sequential(file_object)
+            return self._send_file_object(
+                file_object=file_object,
+                remote_path_to_save=remote_path_to_save,
+                **kwargs
+            )
+
     def get_file_to_object(self, remote_file_path: Union[str, Path],
                            file_object: BinaryIO, **kwargs) -> int:
         """
@@ -134,7 +637,7 @@ class RemoteStorageConnection(metaclass=ABCMeta):
         int
             Number of bytes put into the file object.
         """
-        remote_file_path = Path(self.work_dir, remote_file_path)
+        remote_file_path = self._resolve(remote_file_path)
         return self._get_file_to_object(remote_file_path=remote_file_path,
                                         file_object=file_object, **kwargs)
 
@@ -159,6 +662,35 @@ class RemoteStorageConnection(metaclass=ABCMeta):
         """
         raise NotImplementedError()
 
+    def _get_file_to_path(self, remote_file_path: Path,
+                          local_file_path: Union[str, os.PathLike],
+                          **kwargs) -> int:
+        """
+        Gets a file from a remote server and saves it to a local file.
+        By default the file is opened here and filled with
+        _get_file_to_object(), connections which can transfer files by
+        their paths should override it.
+
+        Parameters
+        ----------
+        remote_file_path: Path
+            Path to the file on the remote machine to retrieve.
+        local_file_path: Union[str, os.PathLike]
+            Path to the file on the local machine to save data into.
+
+        Returns
+        ----------
+        int
+            Number of bytes saved to the local file.
+        """
+        with open(local_file_path, 'wb',
+                  buffering=_LOCAL_BUFFER_SIZE) as file_object:
+            return self._get_file_to_object(
+                remote_file_path=remote_file_path,
+                file_object=file_object,
+                **kwargs
+            )
+
     def file_exists(self, remote_file_path: Union[str, Path], **kwargs):
         """
         Checks if a file or a directory with the passed path exists
@@ -174,8 +706,14 @@ class RemoteStorageConnection(metaclass=ABCMeta):
         bool
             Whether the file exists or not
         """
-        remote_file_path = Path(self.work_dir, remote_file_path)
-        raise self._file_exists(remote_file_path, **kwargs)
+        # A fresh cached result is returned without asking the storage
+        key = self._join_posix(remote_file_path)
+        cached = self._stat_cache_get(key)
+        if cached is not None:
+            return cached[0]
+        exists = self._file_exists(self._posix_to_path(key), **kwargs)
+        self._stat_cache_put(key, exists)
+        return exists
 
     @abstractmethod
     def _file_exists(self, remote_file_path: Union[str, Path], **kwargs):
@@ -208,8 +746,12 @@ class RemoteStorageConnection(metaclass=ABCMeta):
             raise FileNotFound(f"File with such path ({remote_file_path}) "
                                f"doesn't exist on the remote storage.")
 
-        remote_file_path = Path(self.work_dir, remote_file_path)
-        return self._delete_file(remote_file_path=remote_file_path, **kwargs)
+        remote_file_path = self._resolve(remote_file_path)
+        try:
+            return self._delete_file(remote_file_path=remote_file_path,
+                                     **kwargs)
+        finally:
+            self._stat_cache_invalidate(remote_file_path)
 
     @abstractmethod
     def _delete_file(self, remote_file_path: Union[str, Path], **kwargs):
@@ -223,6 +765,27 @@ class RemoteStorageConnection(metaclass=ABCMeta):
         """
         raise NotImplementedError()
 
+    def delete_file_if_exists(self, remote_file_path: Union[str, Path],
+                              **kwargs) -> bool:
+        """
+        Removes a file from remote machine if it exists.
+
+        Parameters
+        ----------
+        remote_file_path: Union[str, Path]
+            Path to the file to remove.
+
+        Returns
+        ----------
+        bool
+            True if the file has been removed and False if it
+            didn't exist.
+        """
+        if not self.file_exists(remote_file_path):
+            return False
+        self.delete_file(remote_file_path, **kwargs)
+        return True
+
     def get_file_attributes(self, remote_file_path: Union[str, Path],
                             **kwargs) -> FileAttributes:
         """
@@ -239,13 +802,21 @@ class RemoteStorageConnection(metaclass=ABCMeta):
         rsc.base.FileAttributes
             Attributes of the file.
         """
+        resolved_path = self._resolve(remote_file_path)
+        # Cached attributes are handed out as copies, so that callers
+        # changing them don't change the cache
+        cached = self._stat_cache_get(resolved_path)
+        if cached is not None and cached[1] is not None:
+            return copy(cached[1])
         if not self.file_exists(remote_file_path):
             raise FileNotFound(f"File with such path ({remote_file_path}) "
                                f"doesn't exist on the remote storage.")
 
-        remote_file_path = Path(self.work_dir, remote_file_path)
-        return self._get_file_attributes(remote_file_path=remote_file_path,
-                                         **kwargs)
+        attributes = self._get_file_attributes(
+            remote_file_path=resolved_path, **kwargs
+        )
+        self._stat_cache_put(resolved_path, True, attributes)
+        return copy(attributes)
 
     @abstractmethod
     def _get_file_attributes(self, remote_file_path: Union[str, Path],
@@ -287,19 +858,44 @@ class RemoteStorageConnection(metaclass=ABCMeta):
         bool
             True if the directory has been created and False otherwise.
         """
-        if not exist_ok and self.file_exists(new_directory_path):
-            raise FileExists(f"Directory with such path "
-                             f"({new_directory_path}) already "
-                             f"exists on the remote storage.")
+        # The directory itself is always checked, remembered directories
+        # only stop the scan of its parents
+        if self.file_exists(new_directory_path):
+            if not exist_ok:
+                raise FileExists(f"Directory with such path "
+                                 f"({new_directory_path}) already "
+                                 f"exists on the remote storage.")
+            return False
 
         if create_parents:
-            path_parents = list(Path(new_directory_path).parents)[::-1]
-            for parent in path_parents:
-                self.create_directory(parent, exist_ok=True)
-
-        new_directory_path = Path(self.work_dir, new_directory_path)
-        return self._create_directory(new_directory_path=new_directory_path,
-                                      **kwargs)
+            # Ancestors are checked from the nearest one up to the first
+            # existing (or remembered), so only the missing part of
+            # the path is created.
+            missing_parents = []
+            for parent in _as_path(new_directory_path).parents:
+                parent = self._resolve(parent)
+                if self._is_known_directory(parent.as_posix()):
+                    break
+                if self.file_exists(parent):
+                    self._remember_directory(parent.as_posix())
+                    break
+                missing_parents.append(parent)
+            for parent in reversed(missing_parents):
+                try:
+                    self._create_directory(new_directory_path=parent)
+                finally:
+                    self._stat_cache_invalidate(parent)
+                self._remember_directory(parent.as_posix())
+
+        new_directory_path = self._resolve(new_directory_path)
+        try:
+            result = self._create_directory(
+                new_directory_path=new_directory_path, **kwargs
+            )
+        finally:
+            self._stat_cache_invalidate(new_directory_path)
+        self._remember_directory(new_directory_path.as_posix())
+        return result
 
     @abstractmethod
     def _create_directory(self, new_directory_path: Union[str, Path],
@@ -319,6 +915,30 @@ class RemoteStorageConnection(metaclass=ABCMeta):
         """
         raise NotImplementedError()
 
+    def create_directory_if_missing(self,
+                                    new_directory_path: Union[str, Path],
+                                    create_parents: bool = False,
+                                    **kwargs) -> bool:
+        """
+        Creates a directory with the passed path unless it exists.
+
+        Parameters
+        ----------
+        new_directory_path: Union[str, Path]
+            New directory absolute path.
+        create_parents: bool
+            Whether the script should automatically create missing
+            parent directories or not.
+
+        Returns
+        ----------
+        bool
+            True if the directory has been created and False if it
+            already existed.
+        """
+        return self.create_directory(new_directory_path, create_parents,
+                                     exist_ok=True, **kwargs) is not False
+
     def delete_directory(self, remote_directory_path: Union[str, Path],
                          recursive: bool = False, **kwargs):
         """
@@ -342,23 +962,67 @@ class RemoteStorageConnection(metaclass=ABCMeta):
             raise FileNotFound(f"Directory with such path "
                                f"({remote_directory_path}) doesn't "
                                f"exists on the remote storage.")
-        if recursive:
-            current_dir = self.get_file_attributes(remote_directory_path)
-            path_list = self.list_path(remote_directory_path)
-            for file in path_list:
-                if current_dir.path == file.path or \
-                        file.path.as_posix()[-2:] in ['/.', '..']:
+        remote_directory_path = self._resolve(remote_directory_path)
+        try:
+            if recursive:
+                self._delete_directory_contents(remote_directory_path)
+            return self._delete_directory(
+                remote_directory_path=remote_directory_path,
+                **kwargs
+            )
+        finally:
+            self._stat_cache_invalidate(remote_directory_path, recursive=True)
+
+    def _delete_directory_contents(self, remote_directory_path: Path):
+        """
+        Removes everything inside the directory. The tree is walked
+        with an explicit stack listing every directory only once, files
+        are removed as soon as their directory is listed and directories
+        are removed after the walk, the deepest ones going first.
+        No existence checks are made along the way.
+
+        Parameters
+        ----------
+        remote_directory_path: Path
+            Remote directory path with the working directory applied.
+        """
+        directories = []
+        stack = [remote_directory_path]
+        while stack:
+            directory = stack.pop()
+            files = []
+            for file in self._list_path(remote_directory_path=directory):
+                if file.name in _SPECIAL_NAMES:
                     continue
+                file_path = directory / file.name
                 if file.is_directory():
-                    self.delete_directory(file.path, True)
+                    stack.append(file_path)
+                    directories.append(file_path)
                 else:
-                    self.delete_file(file.path)
+                    files.append(file_path)
+            if files:
+                self._delete_directory_files(directory, files)
+        # Every directory is listed after its parent, so the reversed
+        # order removes children first.
+        for directory in reversed(directories):
+            self._delete_directory(remote_directory_path=directory)
+
+    def _delete_directory_files(self, remote_directory_path: Path,
+                                files: list):
+        """
+        Removes the listed files (not directories) of one directory.
+        Connections able to remove many files in one request
+        can override it.
 
-        remote_directory_path = Path(self.work_dir, remote_directory_path)
-        return self._delete_directory(
-            remote_directory_path=remote_directory_path,
-            **kwargs
-        )
+        Parameters
+        ----------
+        remote_directory_path: Path
+            Directory the files are in.
+        files: list
+            Paths of all the files in the directory.
+        """
+        for file_path in files:
+            self._delete_file(remote_file_path=file_path)
 
     @abstractmethod
     def _delete_directory(self, remote_directory_path: Union[str, Path],
@@ -380,11 +1044,12 @@ class RemoteStorageConnection(metaclass=ABCMeta):
         raise NotImplementedError()
 
     def get_directory(self, remote_directory_path: Union[str, Path],
-                      local_path_to_save: Union[str, Path], **kwargs):
+                      local_path_to_save: Union[str, Path],
+                      concurrency: int = 1, **kwargs):
         """
         Retrieves a directory from the remote storage to local.
-        It's important to note that it transfers files one by one,
-        which can take long.
+        It's important to note that it transfers files one by one
+        unless concurrency is set, which can take long.
 
         Parameters
         ----------
@@ -392,25 +1057,59 @@ class RemoteStorageConnection(metaclass=ABCMeta):
             Path to the remote directory to transfer to the local machine.
         local_path_to_save: Union[str, Path]
             Path on the local storage to put the remote directory.
+        concurrency: int
+            How many files can be transferred at the same time.
+            The connection must support being used from several threads.
 
         """
         if not os.path.exists(local_path_to_save):
             raise FileNotFound(f'There is no local directory '
                                f'with path {local_path_to_save}.')
-        for remote_file in self.list_path(remote_directory_path):
-            local_file_path = Path(local_path_to_save,
-                                   remote_file.name).as_posix()
-            if not os.path.exists(local_file_path) or \
-                    remote_file.is_directory() or \
-                    remote_file.size != os.stat(local_file_path).st_size:
+        transfers = []
+        directories = [(remote_directory_path, local_path_to_save, True)]
+        while directories:
+            remote_directory, local_directory, scan = directories.pop()
+            # One scan of the local directory replaces the existence
+            # checks and stats of every file in it. Directories created
+            # here are known to be empty.
+            local_entries = self._scan_local_directory(local_directory) \
+                if scan else {}
+            for remote_file in self.list_path(remote_directory):
                 if remote_file.is_symlink():
                     continue
-                elif remote_file.is_directory():
-                    if not os.path.exists(local_file_path):
+                local_file_path = Path(local_directory,
+                                       remote_file.name).as_posix()
+                local_entry = local_entries.get(
+                    os.path.normcase(remote_file.name))
+                if remote_file.is_directory():
+                    if local_entry is None:
                         os.mkdir(local_file_path)
-                    self.get_directory(remote_file.path, local_file_path)
-                else:
-                    self.get_file(remote_file.path, local_file_path)
+                    directories.append((remote_file.path, local_file_path,
+                                        local_entry is not None))
+                elif local_entry is None or \
+                        remote_file.size != self._local_size(local_entry):
+                    transfers.append((remote_file.path, local_file_path))
+        self._run_transfers(self.get_file, transfers, concurrency)
+
+    @staticmethod
+    def _scan_local_directory(local_directory: Union[str, Path]) -> dict:
+        """
+        Returns entries of the local directory by their
+        (case-normalized) names.
+        """
+        with os.scandir(local_directory) as entries:
+            return {os.path.normcase(entry.name): entry for entry in entries}
+
+    @staticmethod
+    def _local_size(local_entry: os.DirEntry):
+        """
+        Returns size of the local file or None if it can't be read
+        (e.g. the entry is a broken symlink).
+        """
+        try:
+            return local_entry.stat().st_size
+        except OSError:
+            return None
 
     def list_path(self, remote_directory_path: Union[str, Path] = '',
                   **kwargs):
@@ -432,8 +1131,17 @@ class RemoteStorageConnection(metaclass=ABCMeta):
                                f"({remote_directory_path}) doesn't exist on "
                                f"the remote storage.")
 
-        remote_directory_path = Path(self.work_dir, remote_directory_path)
-        return self._list_path(remote_directory_path=remote_directory_path)
+        remote_directory_path = self._resolve(remote_directory_path)
+        files = self._list_path(remote_directory_path=remote_directory_path)
+        # The listing already carries attributes of every entry, so
+        # they are kept for the calls which usually follow it.
+        if self.stat_cache_ttl > 0:
+            for file in files:
+                if file.name in _SPECIAL_NAMES:
+                    continue
+                self._stat_cache_put(remote_directory_path / file.name,
+                                     True, copy(file))
+        return files
 
     @abstractmethod
     def _list_path(self, remote_directory_path: Union[str, Path] = '',
@@ -454,9 +1162,56 @@ class RemoteStorageConnection(metaclass=ABCMeta):
         """
         raise NotImplementedError()
 
+    @contextmanager
+    def open_remote(self, remote_file_path: Union[str, Path],
+                    mode: str = 'rb', create_parents: bool = False,
+                    spool_size: int = _SPOOL_SIZE) -> Iterator[BinaryIO]:
+        """
+        Opens a remote file as a local binary file object.
+        In 'rb' mode the file is downloaded when the block starts, in 'wb'
+        mode everything written in the block is uploaded with one transfer
+        when it ends (nothing is sent if the block raises an exception).
+        Data is kept in memory up to spool_size bytes and in a temporary
+        file after that.
+
+        Parameters
+        ----------
+        remote_file_path: Union[str, Path]
+            Path to the file on the remote machine.
+        mode: str
+            'rb' for reading the file or 'wb' for writing it.
+        create_parents: bool
+            Whether missing parent directories of the file should be
+            created before writing it.
+        spool_size: int
+            How many bytes are kept in memory.
+
+        Returns
+        ----------
+        BinaryIO
+            Local file object with contents of the remote file.
+        """
+        if mode not in ('rb', 'wb'):
+            raise ValueError(f"Mode must be either 'rb' or 'wb' "
+                             f"(got {mode}).")
+        with SpooledTemporaryFile(max_size=spool_size) as local_file:
+            if mode == 'rb':
+                if not self.file_exists(remote_file_path):
+                    raise FileNotFound(f"File with such path "
+                                       f"({remote_file_path}) doesn't "
+                                       f"exist on the remote storage.")
+                self.get_file_to_object(remote_file_path, local_file)
+                local_file.seek(0)
+            yield local_file
+            if mode == 'wb':
+                local_file.seek(0)
+                self.send_file_object(local_file, remote_file_path,
+                                      create_parents=create_parents)
+
     def send_file(self, local_file: Union[str, Path, IO],
                   remote_path_to_save: Union[str, Path],
-                  create_parents: bool = False, **kwargs):
+                  create_parents: bool = False, rewind: bool = True,
+                  **kwargs):
         """
         Sends a file to a remote server.
 
@@ -470,24 +1225,27 @@ class RemoteStorageConnection(metaclass=ABCMeta):
         create_parents: bool
             Whether the script should automatically create missing path
             directories in the path or not.
+        rewind: bool
+            Whether a seekable IO object should be sent from its start.
+            If it's False (or the object can't seek, like a pipe),
+            the data is sent from the current position.
 
         """
-        remote_path_to_save = Path(remote_path_to_save)
-        if create_parents:
-            self.create_directory(remote_path_to_save.parent.as_posix(),
-                                  create_parents=create_parents, exist_ok=True)
-
-        file_object = self.__get_binary_io_object(local_file, 'rb')
-        file_object.seek(0)
-
-        result = self.send_file_object(file_object,
-                                       remote_path_to_save,
-                                       **kwargs)
-
         if isinstance(local_file, (str, os.PathLike)):
-            file_object.close()
-
-        return result
+            return self._send(self._send_file_path, remote_path_to_save,
+                              create_parents, local_file_path=local_file,
+                              **kwargs)
+        file_object = self.__get_binary_io_object(local_file, 'rb')
+        try:
+            if rewind and file_object.seekable():
+                file_object.seek(0)
+            return self.send_file_object(file_object,
+                                         remote_path_to_save,
+                                         create_parents=create_parents,
+                                         **kwargs)
+        finally:
+            if file_object is not local_file:
+                file_object.close()
 
     def get_file(self, remote_file_path: Union[str, Path],
                  where_to_put: Union[str, Path, IO],
@@ -517,22 +1275,26 @@ class RemoteStorageConnection(metaclass=ABCMeta):
         if create_parents and not isinstance(where_to_put, IOBase):
             Path(where_to_put).parent.mkdir(parents=True, exist_ok=True)
 
-        file_object = self.__get_binary_io_object(where_to_put)
-
-        result = self.get_file_to_object(remote_file_path, file_object,
-                                         **kwargs)
-
         if isinstance(where_to_put, (str, os.PathLike)):
-            file_object.close()
-
-        return result
+            return self._get_file_to_path(
+                remote_file_path=self._resolve(remote_file_path),
+                local_file_path=where_to_put,
+                **kwargs
+            )
+        file_object = self.__get_binary_io_object(where_to_put)
+        try:
+            return self.get_file_to_object(remote_file_path, file_object,
+                                           **kwargs)
+        finally:
+            if file_object is not where_to_put:
+                file_object.close()
 
     def send_directory(self, local_directory_path: Union[str, Path],
                        remote_path_to_save: Union[str, Path],
-                       create_parents: bool = False):
+                       create_parents: bool = False, concurrency: int = 1):
         """
         Sends a local directory to the remote server. Notice, that files are
-        transferred one by one, which can be long.
+        transferred one by one unless concurrency is set, which can be long.
 
         Parameters
         ----------
@@ -543,28 +1305,69 @@ class RemoteStorageConnection(metaclass=ABCMeta):
         create_parents: bool
             Whether the script should automatically create missing parents on
             the way to the directory.
+        concurrency: int
+            How many files can be transferred at the same time.
+            The connection must support being used from several threads.
         """
-        remote_path_to_save = Path(remote_path_to_save)
+        # Paths inside the directory are derived from the resolved one,
+        # so the working directory is applied only once.
+        remote_path_to_save = self._resolve(remote_path_to_save)
         if create_parents:
-            self.create_directory(remote_path_to_save.parent.as_posix(),
+            self.create_directory(remote_path_to_save.parent,
                                   create_parents=create_parents, exist_ok=True)
 
+        # Directories are created before any file is sent, so that
+        # parallel transfers don't race for them.
         self.create_directory(remote_path_to_save)
-        for file in os.listdir(local_directory_path):
-            file_abspath = Path(local_directory_path, file)
-            if os.path.isdir(file_abspath):
-                self.send_directory(file_abspath,
-                                    Path(remote_path_to_save, file))
-            else:
-                self.send_file(file_abspath, Path(remote_path_to_save, file))
+        transfers = []
+        directories = [(local_directory_path, remote_path_to_save)]
+        while directories:
+            local_directory, remote_directory = directories.pop()
+            with os.scandir(local_directory) as entries:
+                entries = list(entries)
+            for entry in entries:
+                remote_file_path = remote_directory / entry.name
+                # Symlinks are followed as before, other entries don't
+                # need a stat to tell directories from files.
+                if entry.is_dir():
+                    self.create_directory(remote_file_path)
+                    directories.append((entry.path, remote_file_path))
+                else:
+                    transfers.append((entry.path, remote_file_path))
+        self._run_transfers(self.send_file, transfers, concurrency)
+
+    @staticmethod
+    def _run_transfers(transfer: Callable, transfers: list,
+                       concurrency: int = 1):
+        """
+        Calls transfer(source, destination) for every pair in transfers,
+        using up to concurrency threads. The first error is raised
+        after cancelling transfers which haven't started yet.
+        """
+        if concurrency <= 1 or len(transfers) <= 1:
+            for source, destination in transfers:
+                transfer(source, destination)
+            return
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = [executor.submit(transfer, source, destination)
+                       for source, destination in transfers]
+            try:
+                for future in as_completed(futures):
+                    future.result()
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
 
     def create_file(self, remote_file_path: Union[str, Path],
                     file_contents: Union[str, bytes, bytearray, IO] = None,
-                    create_parents: bool = False):
+                    create_parents: bool = False) -> int:
         """
         Creates files on the remote machine with given contents.
-        Uses implemented send_file method of the current
-        class passing IO object as a file argument.
+        Uses implemented send_file_object method of the current
+        class passing IO object as a file argument. Text is stored
+        in UTF-8, IO objects are sent from their start if they can seek.
 
         Parameters
         ----------
@@ -574,23 +1377,36 @@ class RemoteStorageConnection(metaclass=ABCMeta):
             What to put into the newly created file.
         create_parents: bool
             Whether the method should create parent folders if don't exist.
-        """
-        remote_file_path = Path(remote_file_path)
-        if create_parents and not self.file_exists(remote_file_path.parent) \
-                and remote_file_path.parent.as_posix() != ".":
-            self.create_directory(remote_file_path.parent,
-                                  create_parents=create_parents,
-                                  exist_ok=True)
 
-        if isinstance(file_contents, str) or file_contents is None:
-            file_contents = StringIO(file_contents)
-        elif isinstance(file_contents, (bytes, bytearray)):
-            file_contents = BytesIO(file_contents)
-        elif not isinstance(file_contents, IOBase):
+        Returns
+        ----------
+        int
+            Number of bytes stored in the file.
+        """
+        if file_contents is None:
+            file_contents = b''
+        elif isinstance(file_contents, str):
+            file_contents = file_contents.encode()
+        if isinstance(file_contents, (bytes, bytearray)):
+            self.send_file_object(BytesIO(file_contents), remote_file_path,
+                                  create_parents=create_parents)
+            return len(file_contents)
+        if not isinstance(file_contents, IOBase):
             raise TypeError('File contents must be an instance '
                             'of str, bytes or IO type.')
 
-        self.send_file(file_contents, remote_file_path, create_parents)
+        # Sizes of IO objects are only known once they are read
+        file_object = self.__get_binary_io_object(file_contents, 'rb')
+        try:
+            if file_object.seekable():
+                file_object.seek(0)
+            counter = _CountingReader(file_object)
+            self.send_file_object(counter, remote_file_path,
+                                  create_parents=create_parents)
+        finally:
+            if file_object is not file_contents:
+                file_object.close()
+        return counter.size
 
     def convert_to_fileattributes(self, file_object,
                                   remote_file_path: Union[str, Path]):
@@ -614,12 +1430,23 @@ class RemoteStorageConnection(metaclass=ABCMeta):
 
     @staticmethod
     def __get_binary_io_object(source: Union[str, Path, StringIO, BytesIO],
-                               mode="ab+"):
+                               mode="wb"):
+        """
+        Returns a binary IO object for reading ('rb' mode) or writing
+        ('wb' mode) data of the passed source. Objects which are created
+        here (i.e. are not the source itself) have to be closed
+        by the caller.
+        """
         if isinstance(source, (str, os.PathLike)):
-            file_object = open(source, mode)
+            file_object = open(source, mode, buffering=_LOCAL_BUFFER_SIZE)
+            if 'r' in mode:
+                _advise_sequential(file_object)
         elif isinstance(source, StringIO):
-            file_object = BytesIO(source.getvalue().encode('utf-8'))
-        elif isinstance(source, BytesIO):
+            if 'r' in mode:
+                file_object = _TextIOReader(source)
+            else:
+                file_object = _TextIOWriter(source)
+        elif isinstance(source, (BufferedIOBase, RawIOBase)):
             file_object = source
         else:
             raise TypeError(f'local_file_path must be an instance of str, '
@@ -627,14 +1454,243 @@ class RemoteStorageConnection(metaclass=ABCMeta):
         return file_object
 
 
+class ConnectionPool:
+    """
+    Pool of authenticated sessions of a remote storage, so that opening
+    and authenticating a session happen once per session instead of
+    once per operation or connection object.
+
+    A session is borrowed with acquire() and given back when the block
+    ends. Calling a method of the session class on the pool itself
+    borrows a session for the time of the call, so the pool can be used
+    in place of a session. Subclasses tell which class the sessions are
+    of, which errors break a session and how idle sessions are checked.
+    """
+
+    _pools = {}
+    _pools_lock = threading.Lock()
+
+    # Class of the pooled sessions
+    _session_class = None
+    # Errors after which a session can't be reused
+    _session_errors = (OSError,)
+
+    def __init__(self, factory: Callable, size: int = 4,
+                 recycle: float = 60):
+        """
+        Parameters
+        ----------
+        factory: Callable
+            Function opening a new authenticated session.
+        size: int
+            How many idle sessions the pool keeps.
+        recycle: float
+            Sessions idle longer than this number of seconds are checked
+            with _is_alive() before they are handed out again.
+        """
+        self._factory = factory
+        self._recycle = recycle
+        # LIFO order keeps using the most recently active sessions
+        self._idle = queue.LifoQueue(maxsize=size)
+        # Registry key of a process-wide pool and the number of
+        # get_pool() callers which haven't detached from it yet
+        self._key = None
+        self._users = 0
+        # Closed pools close sessions given back to them
+        self._closed = False
+
+    @classmethod
+    def get_pool(cls, key: tuple, factory: Callable,
+                 size: int = 4) -> 'ConnectionPool':
+        """
+        Returns the process-wide pool for the key, creating it with the
+        passed factory if there is no such pool yet. Every caller should
+        give the pool back with detach() once it doesn't need it.
+        """
+        with cls._pools_lock:
+            pool = cls._pools.get((cls, key))
+            if pool is None:
+                pool = cls._pools[(cls, key)] = cls(factory, size)
+                pool._key = (cls, key)
+            pool._users += 1
+        return pool
+
+    @classmethod
+    def close_all(cls):
+        """
+        Closes idle sessions of all process-wide pools of the class and
+        of its subclasses, and forgets the pools, e.g. when the
+        application shuts down.
+        """
+        with cls._pools_lock:
+            pools = [pool for (pool_class, _), pool in cls._pools.items()
+                     if issubclass(pool_class, cls)]
+            for pool in pools:
+                del cls._pools[pool._key]
+        for pool in pools:
+            pool.close()
+
+    def detach(self):
+        """
+        Gives back a pool taken with get_pool(). When its last user
+        detaches, the pool is forgotten and its idle sessions are closed.
+        """
+        with self._pools_lock:
+            if self._users:
+                self._users -= 1
+            if self._users:
+                return
+            if self._pools.get(self._key) is self:
+                del self._pools[self._key]
+        self.close()
+
+    @contextmanager
+    def acquire(self) -> Iterator:
+        """
+        Borrows a live session from the pool and gives it back when the
+        block ends. A session which failed with a connection error is
+        closed instead of being given back.
+        """
+        session = self._checkout()
+        broken = False
+        try:
+            yield session
+        except self._session_errors:
+            broken = True
+            raise
+        finally:
+            if broken:
+                self._close_session(session)
+            else:
+                self._release(session)
+
+    def close(self):
+        """
+        Closes all idle sessions of the pool. Sessions borrowed at the
+        moment are closed when they are given back.
+        """
+        self._closed = True
+        while True:
+            try:
+                session, _ = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._close_session(session)
+
+    def _checkout(self):
+        while True:
+            try:
+                session, released_at = self._idle.get_nowait()
+            except queue.Empty:
+                return self._factory()
+            if monotonic() - released_at < self._recycle or \
+                    self._is_alive(session):
+                return session
+            self._close_session(session)
+
+    def _release(self, session):
+        if self._closed:
+            self._close_session(session)
+            return
+        try:
+            self._idle.put_nowait((session, monotonic()))
+        except queue.Full:
+            self._close_session(session)
+            return
+        # close() may have emptied the pool right before the put
+        if self._closed:
+            self.close()
+
+    @staticmethod
+    def _is_alive(session) -> bool:
+        return True
+
+    @staticmethod
+    def _close_session(session):
+        session.close()
+
+    def __getattr__(self, name):
+        if not callable(getattr(self._session_class, name, None)):
+            raise AttributeError(f"'{self.__class__.__name__}' object "
+                                 f"has no attribute '{name}'")
+
+        def call(*args, **kwargs):
+            with self.acquire() as session:
+                return getattr(session, name)(*args, **kwargs)
+        return call
+
+
+class SMBConnectionPool(ConnectionPool):
+    """
+    Pool of authenticated pysmb sessions. It is shared by all
+    SMBConnection objects using the same storage and credentials.
+    Sessions idle for longer than recycle seconds are checked with
+    an echo request.
+    """
+
+    _session_class = pySMBConnection
+    _session_errors = (smb.base.NotConnectedError, smb.base.SMBTimeout,
+                       OSError)
+
+    @staticmethod
+    def _is_alive(session: pySMBConnection) -> bool:
+        try:
+            session.echo(b'rsc')
+        except Exception:
+            return False
+        return True
+
+
+class SFTPClientPool(ConnectionPool):
+    """
+    Pool of paramiko SFTP clients, each one working over its own SSH
+    transport, so that independent operations don't wait for each other
+    on a single channel.
+    """
+
+    _session_class = paramiko.SFTPClient
+    # File errors (IOError) don't break a client, so only transport
+    # failures are listed.
+    _session_errors = (paramiko.SSHException, EOFError, ConnectionError,
+                       socket.timeout)
+
+    @staticmethod
+    def _is_alive(session: paramiko.SFTPClient) -> bool:
+        # Checking the transport doesn't need a round trip
+        return session.get_channel().get_transport().is_active()
+
+    @staticmethod
+    def _close_session(session: paramiko.SFTPClient):
+        session.get_channel().get_transport().close()
+
+
 class SMBConnection(RemoteStorageConnection):
     """
     Connection which uses "pysmb" library to operate files
     on a remote storage using SMB.
+
+    Sessions are taken from a pool shared by connections to the same
+    storage with the same credentials (see SMBConnectionPool), so every
+    operation borrows an already authenticated session. close() (called
+    when the connection is used as a context manager or deleted) detaches
+    the connection from the pool, which closes the sessions once no
+    connection uses them.
+
+    SMB2 servers advertise the largest read, write and transaction sizes
+    they accept, and pysmb sends requests of that size. max_read_size,
+    max_write_size and max_transact_size cap those values (8 MB by
+    default). Every transfer keeps one piece of the chosen size in
+    memory, so memory use grows with the caps. timeout is the number of
+    seconds given to each request of a transfer. It may need to be
+    raised together with the caps on slow networks.
+
+    Direct TCP (port 445) is used unless is_direct_tcp is False, in which
+    case the session goes over NetBIOS (port 139). my_name defaults to
+    the username and remote_name to the remote IP.
     """
 
     @property
-    def connection(self) -> pySMBConnection:
+    def connection(self) -> SMBConnectionPool:
         return self._connection
 
     @property
@@ -643,31 +1699,90 @@ class SMBConnection(RemoteStorageConnection):
 
     def __init__(self, remote_ip: str, username: str, password: str,
                  shared_folder: str = "", remote_name: str = None,
-                 is_direct_tcp: str = None, my_name: str = None,
-                 work_dir: Union[str, Path] = "", **kwargs):
+                 is_direct_tcp: bool = None, my_name: str = None,
+                 work_dir: Union[str, Path] = "", pool_size: int = 4,
+                 max_read_size: int = _SMB_MAX_IO_SIZE,
+                 max_write_size: int = _SMB_MAX_IO_SIZE,
+                 max_transact_size: int = _SMB_MAX_IO_SIZE,
+                 timeout: int = 30, **kwargs):
+        factory = partial(self._open_session, remote_ip, username, password,
+                          my_name or username, remote_name or remote_ip,
+                          True if is_direct_tcp is None else is_direct_tcp,
+                          max_read_size=max_read_size,
+                          max_write_size=max_write_size,
+                          max_transact_size=max_transact_size)
+        # The registry of pools keeps a digest instead of the password
+        pool_key = (remote_ip, username,
+                    hashlib.sha256(password.encode()).hexdigest(),
+                    shared_folder, my_name, remote_name, is_direct_tcp,
+                    max_read_size, max_write_size, max_transact_size)
+        self._connection = SMBConnectionPool.get_pool(pool_key, factory,
+                                                      pool_size)
+        # Borrow a session right away to report connection errors here
+        with self._connection.acquire():
+            pass
+        self._shared_folder = shared_folder
+        self._work_dir = work_dir
+        self._timeout = timeout
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            # Modules may already be torn down at interpreter exit
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """
+        Detaches the connection from the shared pool of sessions, which
+        closes them if no other connection uses the pool.
+        """
+        if self._connection is not None:
+            self._connection.detach()
+            self._connection = None
+
+    @staticmethod
+    def _open_session(remote_ip: str, username: str, password: str,
+                      my_name: str, remote_name: str, is_direct_tcp: bool,
+                      max_read_size: int = _SMB_MAX_IO_SIZE,
+                      max_write_size: int = _SMB_MAX_IO_SIZE,
+                      max_transact_size: int = _SMB_MAX_IO_SIZE
+                      ) -> pySMBConnection:
         connection = pySMBConnection(username=username, password=password,
-                                     my_name=my_name or username,
-                                     remote_name=remote_name or remote_ip,
-                                     is_direct_tcp=is_direct_tcp or True)
+                                     my_name=my_name,
+                                     remote_name=remote_name,
+                                     is_direct_tcp=is_direct_tcp)
         try:
-            if not connection.connect(remote_ip, 445):
+            if not connection.connect(remote_ip,
+                                      445 if is_direct_tcp else 139):
                 raise ConnectionFailure("Couldn't connect to the SMB storage "
                                         "with such credentials.")
         except socket.gaierror:
             raise ConnectionFailure(f"There was an error connecting to the "
                                     f"SMB storage ({remote_ip}): host is not "
                                     f"accessable.")
-        self._connection = connection
-        self._shared_folder = shared_folder
-        self._work_dir = work_dir
-
-    def __del__(self):
-        if hasattr(self, '_connection') and self._connection:
-            self._connection.close()
+        # The sizes are only negotiated (i.e. non-zero) over SMB2
+        if connection.max_read_size:
+            connection.max_read_size = min(connection.max_read_size,
+                                           max_read_size)
+        if connection.max_write_size:
+            connection.max_write_size = min(connection.max_write_size,
+                                            max_write_size)
+        if connection.max_transact_size:
+            connection.max_transact_size = min(connection.max_transact_size,
+                                               max_transact_size)
+        return connection
 
     def _send_file_object(self, file_object: BinaryIO,
                           remote_path_to_save: Path,
                           **kwargs):
+        kwargs.setdefault('timeout', self._timeout)
         try:
             self._connection.storeFile(
                 self.shared_folder, remote_path_to_save.as_posix(),
@@ -680,6 +1795,7 @@ class SMBConnection(RemoteStorageConnection):
 
     def _get_file_to_object(self, remote_file_path: Path,
                             file_object: BinaryIO, **kwargs) -> int:
+        kwargs.setdefault('timeout', self._timeout)
         try:
             return self._connection.retrieveFile(
                 self.shared_folder, remote_file_path.as_posix(),
@@ -732,6 +1848,18 @@ class SMBConnection(RemoteStorageConnection):
                                         f"{str(error)}")
         return True
 
+    def _delete_directory_files(self, remote_directory_path: Path,
+                                files: list):
+        # A wildcard removes all files of the directory in one call
+        try:
+            self._connection.deleteFiles(
+                self.shared_folder,
+                Path(remote_directory_path, '*').as_posix()
+            )
+        except OperationFailure as exception:
+            raise NotPerformedException(f"Couldn't delete files in the "
+                                        f"directory: {str(exception.args)}")
+
     def _delete_directory(self, remote_directory_path: Path,
                           **kwargs):
         try:
@@ -755,29 +1883,36 @@ class SMBConnection(RemoteStorageConnection):
             raise NotPerformedException(f"Couldn't list files of a dictionary "
                                         f"with such path: "
                                         f"{remote_directory_path}. {error}")
-        result = []
-        for file in path_list:
-            if file.filename not in ['.', '..']:
-                file_path = Path(remote_directory_path, file.filename)
-                result.append(self.convert_to_fileattributes(file, file_path))
-        return result
+        # Same values as convert_to_fileattributes() gives, but the
+        # fields are fetched at once and the timestamps are left raw
+        rows = [_shared_file_fields(file) for file in path_list
+                if file.filename not in _SPECIAL_NAMES]
+        # The directory is resolved already, so only the share root
+        # is added to it
+        absolute_directory = Path('\\',
+                                  self._absolute_path(remote_directory_path))
+        from_row = FileAttributes.from_row
+        return [
+            from_row(name, size, 'directory' if is_directory else 'file',
+                     remote_directory_path / name, absolute_directory / name,
+                     modification_time, last_access_time, create_time)
+            for name, size, is_directory, modification_time,
+            last_access_time, create_time in rows
+        ]
 
     def convert_to_fileattributes(self, file_object: smb.base.SharedFile,
                                   remote_file_path: Union[str, Path]):
-        remote_file_path = Path(remote_file_path)
-        result = {
-            'name': file_object.filename,
-            'size': file_object.file_size,
-            'type': 'directory' if file_object.isDirectory else 'file',
-            'path': str(remote_file_path),
-            'absolute_path': str(Path('\\', self.work_dir, remote_file_path)),
-            'modification_time':
-                datetime.fromtimestamp(file_object.last_write_time),
-            'last_access_time':
-                datetime.fromtimestamp(file_object.last_access_time),
-            'create_time': datetime.fromtimestamp(file_object.create_time),
-        }
-        return FileAttributes(**result)
+        remote_file_path = _as_path(remote_file_path)
+        # Timestamps are turned into datetime objects by FileAttributes
+        # when they are read
+        return FileAttributes.from_row(
+            file_object.filename, file_object.file_size,
+            'directory' if file_object.isDirectory else 'file',
+            remote_file_path,
+            Path('\\', self._absolute_path(remote_file_path)),
+            file_object.last_write_time, file_object.last_access_time,
+            file_object.create_time
+        )
 
 
 class VMWCConnection(RemoteStorageConnection):
@@ -799,6 +1934,13 @@ class VMWCConnection(RemoteStorageConnection):
         self._vm = self._vcenter_client.get_virtual_machine(machine_name)
         self._vm.vmware_tools.login(machine_login, machine_password)
         self._work_dir = work_dir or "E:\\"
+        # Reading the guest id is a vCenter request, the guest OS doesn't
+        # change while the connection is used, so it's read only once
+        self._is_windows_guest = \
+            self._vm.summary.guest.guestId.find('win') != -1
+        # Turns a Path into the guest's form of it, chosen once as well
+        self._prepare_remote_path = Path.as_win if self._is_windows_guest \
+            else Path.as_posix
 
     def __del__(self):
         if hasattr(self, '_vcenter_client') and self._vcenter_client:
@@ -811,17 +1953,17 @@ class VMWCConnection(RemoteStorageConnection):
     def _send_file_object(self, file_object: BinaryIO,
                           remote_path_to_save: Path,
                           **kwargs):
-        remote_path_to_save = self.__prepare_remote_path(remote_path_to_save)
+        remote_path_to_save = self._prepare_remote_path(remote_path_to_save)
         self._vm.vmware_tools.upload_file(file_object, remote_path_to_save)
 
     def _get_file_to_object(self, remote_file_path: Path,
                             file_object: BinaryIO, **kwargs) -> int:
-        remote_file_path = self.__prepare_remote_path(remote_file_path)
+        remote_file_path = self._prepare_remote_path(remote_file_path)
         return self._vm.vmware_tools.download_file(file_object,
                                                    remote_file_path)
 
-    def file_exists(self, remote_file_path: Path, **kwargs):
-        remote_file_path = self.__prepare_remote_path(remote_file_path)
+    def _file_exists(self, remote_file_path: Path, **kwargs):
+        remote_file_path = self._prepare_remote_path(remote_file_path)
         try:
             result = self._vm.vmware_tools.file_exists(remote_file_path)
         except Exception as error:
@@ -832,7 +1974,7 @@ class VMWCConnection(RemoteStorageConnection):
         return result
 
     def _delete_file(self, remote_file_path: Path, **kwargs):
-        remote_file_path = self.__prepare_remote_path(remote_file_path)
+        remote_file_path = self._prepare_remote_path(remote_file_path)
         try:
             result = self._vm.vmware_tools.delete_file(remote_file_path)
         except Exception as error:
@@ -843,19 +1985,19 @@ class VMWCConnection(RemoteStorageConnection):
 
     def _get_file_attributes(self, remote_file_path: Path,
                              **kwargs):
-        remote_file_path = self.__prepare_remote_path(remote_file_path)
+        file_path = self._prepare_remote_path(remote_file_path)
         try:
             file_object = self._vm.vmware_tools.\
-                get_file_attributes(remote_file_path)
+                get_file_attributes(file_path)
         except Exception as error:
             raise NotPerformedException(f"Couldn't get attributes of the file "
                                         f"with such path "
-                                        f"({remote_file_path}): {error}")
+                                        f"({file_path}): {error}")
         return self.convert_to_fileattributes(file_object, remote_file_path)
 
     def _create_directory(self, new_directory_path: Path,
                           **kwargs):
-        new_directory_path = self.__prepare_remote_path(new_directory_path)
+        new_directory_path = self._prepare_remote_path(new_directory_path)
         try:
             self._vm.vmware_tools.create_directory(new_directory_path)
         except Exception as exception:
@@ -863,9 +2005,20 @@ class VMWCConnection(RemoteStorageConnection):
                                         f"such path ({new_directory_path}): "
                                         f"{str(exception)}")
 
-    def delete_directory(self, remote_directory_path: Path,
+    def delete_directory(self, remote_directory_path: Union[str, Path],
                          recursive: bool = False, **kwargs):
-        directory_path = self.__prepare_remote_path(remote_directory_path)
+        # VMware Tools remove the contents themselves, so the generic
+        # walk over the tree isn't used
+        remote_directory_path = self._resolve(remote_directory_path)
+        try:
+            return self._delete_directory(remote_directory_path, recursive,
+                                          **kwargs)
+        finally:
+            self._stat_cache_invalidate(remote_directory_path, recursive=True)
+
+    def _delete_directory(self, remote_directory_path: Path,
+                          recursive: bool = False, **kwargs):
+        directory_path = self._prepare_remote_path(remote_directory_path)
         try:
             self._vm.vmware_tools.delete_directory(directory_path, recursive)
         except Exception as exception:
@@ -875,94 +2028,518 @@ class VMWCConnection(RemoteStorageConnection):
 
     def _list_path(self, remote_directory_path: Path = '',
                    **kwargs):
-        remote_directory_path = self.\
-            __prepare_remote_path(remote_directory_path)
+        directory_path = remote_directory_path
+        remote_directory_path = self._prepare_remote_path(
+            remote_directory_path)
         try:
             file_objects = self._vm.vmware_tools.\
                 list_path(remote_directory_path)
         except Exception as error:
             raise NotPerformedException(f"Couldn't get file list of the path "
                                         f"({remote_directory_path}): {error}")
-        result = []
-        for file_object in file_objects:
-            if file_object.path not in ['.', '..']:
-                file_path = Path(remote_directory_path, file_object.path)
-                result.append(self.convert_to_fileattributes(file_object,
-                                                             file_path))
-        return result
+        convert = self.convert_to_fileattributes
+        return [convert(file_object, directory_path / file_object.path)
+                for file_object in file_objects
+                if file_object.path not in _SPECIAL_NAMES]
 
     def convert_to_fileattributes(self, file_object,
                                   remote_file_path: Union[str, Path]):
-        remote_file_path = Path(remote_file_path)
-        result = {
-            'name': remote_file_path.name,
-            'size': file_object.size,
-            'type': file_object.type,
-            'path': str(remote_file_path),
-            'absolute_path': str(Path(self._work_dir, remote_file_path)),
-            'modification_time': getattr(file_object.attributes,
-                                         'modificationTime').\
-                                                        replace(tzinfo=None),
-            'last_access_time': getattr(file_object.attributes, 'accessTime').\
-                                                        replace(tzinfo=None),
-            'create_time': getattr(file_object.attributes, 'createTime', None),
-        }
-        if result['create_time']:
-            result['create_time'] = result['create_time'].replace(tzinfo=None)
-        return FileAttributes(**result)
-
-    def __prepare_remote_path(self, remote_path: Union[str, Path]):
-        os_type = self.connection.summary.guest.guestId
-        return remote_path.as_win() if os_type.find('win') != -1 \
-            else remote_path.as_posix()
+        remote_file_path = _as_path(remote_file_path)
+        attributes = file_object.attributes
+        create_time = getattr(attributes, 'createTime', None)
+        # The type comes from the guest, so it's still validated
+        # by the constructor
+        return FileAttributes(
+            remote_file_path.name, file_object.size, file_object.type,
+            remote_file_path, self._absolute_path(remote_file_path),
+            attributes.modificationTime.replace(tzinfo=None),
+            attributes.accessTime.replace(tzinfo=None),
+            create_time.replace(tzinfo=None) if create_time else create_time
+        )
 
 
 class SSHConnection(RemoteStorageConnection):
     """
     Connection which uses "paramiko" library to operate files
     on a remote storage using SSH.
+
+    Downloads prefetch the file, keeping up to max_requests read
+    requests in flight (the limit is only applied by paramiko 3.3+,
+    older versions request the whole file at once), and copy it
+    by block_size bytes. Downloads without prefetching report progress
+    with sizes known from the stat cache, if there are any. Uploads are
+    pipelined and, unless confirm is set, skip the stat paramiko makes
+    after them to check the size.
+
+    SFTP clients are taken from a pool of the connection
+    (see SFTPClientPool), every one with its own SSH transport, so that
+    operations made from several threads run in parallel. The pool
+    keeps up to pool_size idle clients. Every transport sends a keepalive
+    every keepalive seconds (0 disables it), so that idle clients aren't
+    dropped by the server or firewalls in between. The connection can be
+    used as a context manager closing the clients at the end.
+
+    window_size and max_packet_size are the SSH channel window and packet
+    sizes (128 MiB and 32 KiB by default). The window limits how much data
+    can be on the way without being acknowledged, so on links with high
+    latency it limits the throughput. Data received in advance is kept in
+    memory, so the window is also an upper bound of the buffered data.
+
+    If the remote machine has tar, send_directory() streams the whole
+    directory as one tar archive through a single SSH channel instead of
+    sending files one by one, and get_directory_fast() gets one back
+    the same way. Machines with a POSIX shell also get
+    many files removed (remove_multiple_files(), recursive
+    delete_directory()) or stat'ed (stat_multiple()) by one command.
     """
 
     @property
-    def connection(self) -> paramiko.SFTPClient:
+    def connection(self) -> SFTPClientPool:
         return self._connection
 
     def __init__(self, remote_ip: str, username: str, password: str,
-                 work_dir="", remote_port: int = 22, **kwargs):
+                 work_dir="", remote_port: int = 22,
+                 block_size: int = 32768, max_requests: int = 64,
+                 confirm: bool = False, pool_size: int = 4,
+                 window_size: int = _SSH_WINDOW_SIZE,
+                 max_packet_size: int = 32768, keepalive: int = 30,
+                 **kwargs):
+        kwargs.setdefault('default_window_size', window_size)
+        kwargs.setdefault('default_max_packet_size', max_packet_size)
+        factory = partial(self._open_client, remote_ip, int(remote_port),
+                          username, password, keepalive, kwargs)
+        self._connection = SFTPClientPool(factory, pool_size, recycle=0)
+        # Open the first client right away to report connection errors here
+        with self._connection.acquire():
+            pass
+        self._work_dir = work_dir
+        self._block_size = block_size
+        self._max_requests = max_requests
+        self._confirm = confirm
+        # Results of _remote_check() by commands
+        self._remote_checks = {}
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            # Modules may already be torn down at interpreter exit
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """
+        Closes SFTP clients of the connection and their transports.
+        Clients borrowed at the moment are closed once they are released.
+        """
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    @staticmethod
+    def _open_client(remote_ip: str, remote_port: int, username: str,
+                     password: str, keepalive: int, transport_kwargs: dict
+                     ) -> paramiko.SFTPClient:
+        ssh = paramiko.Transport((remote_ip, remote_port), **transport_kwargs)
         try:
-            ssh = paramiko.Transport((remote_ip, int(remote_port)), **kwargs)
             ssh.connect(hostkey=None, username=username, password=password)
+            if keepalive:
+                ssh.set_keepalive(keepalive)
+            return paramiko.SFTPClient.from_transport(ssh)
         except paramiko.SSHException as e:
+            ssh.close()
             raise ConnectionFailure(f"Couldn't connect to the "
                                     f"virtual machine: {e}")
 
-        self._connection = paramiko.SFTPClient.from_transport(ssh)
-        self._work_dir = work_dir
+    def _client(self) -> ContextManager[paramiko.SFTPClient]:
+        """
+        Borrows an SFTP client from the pool for the time of the block.
+        """
+        return self._connection.acquire()
 
-    def __del__(self):
-        if hasattr(self, '_connection') and self._connection:
-            self._connection.get_channel().get_transport().close()
+    @staticmethod
+    def _exec(client: paramiko.SFTPClient,
+              command: str) -> paramiko.Channel:
+        """
+        Runs the command on the remote machine in a new channel
+        of the client's transport.
+        """
+        channel = client.get_channel().get_transport().open_session()
+        channel.exec_command(command)
+        return channel
+
+    def _run(self, command: str) -> tuple:
+        """
+        Runs the command on the remote machine and waits for it to exit.
+
+        Returns
+        ----------
+        tuple
+            Exit status, stdout and stderr (bytes) of the command.
+        """
+        with self._client() as client:
+            channel = self._exec(client, command)
+            try:
+                output = channel.makefile('rb').read()
+                errors = channel.makefile_stderr('rb').read()
+                return channel.recv_exit_status(), output, errors
+            finally:
+                channel.close()
+
+    def _remote_check(self, command: str) -> bool:
+        """
+        Checks (once per command) whether the command succeeds on the
+        remote machine. Machines which don't run a POSIX shell
+        (e.g. Windows ones) fail the checks.
+        """
+        result = self._remote_checks.get(command)
+        if result is None:
+            try:
+                result = self._run(command + ' >/dev/null 2>&1')[0] == 0
+            except paramiko.SSHException:
+                result = False
+            self._remote_checks[command] = result
+        return result
+
+    @staticmethod
+    def _batch_commands(command: str, paths: list) -> Iterator[str]:
+        """
+        Yields commands made of the command and as many quoted paths
+        as fit into _SSH_COMMAND_SIZE characters.
+        """
+        batch = [command]
+        size = len(command)
+        for path in paths:
+            argument = shlex.quote(path.as_posix())
+            if len(batch) > 1 and \
+                    size + len(argument) + 1 > _SSH_COMMAND_SIZE:
+                yield ' '.join(batch)
+                batch = [command]
+                size = len(command)
+            batch.append(argument)
+            size += len(argument) + 1
+        if len(batch) > 1:
+            yield ' '.join(batch)
+
+    def _remove_paths(self, paths: list):
+        """
+        Removes files with resolved paths by as few "rm" commands
+        as possible.
+        """
+        try:
+            for command in self._batch_commands('rm -f --', paths):
+                status, _, errors = self._run(command)
+                if status:
+                    raise NotPerformedException(
+                        f"Couldn't delete files. "
+                        f"{errors.decode(errors='replace').strip()}")
+        finally:
+            for path in paths:
+                self._stat_cache_invalidate(path)
+
+    def remove_multiple_files(self, remote_file_paths: list):
+        """
+        Removes many files from the remote machine. On machines with
+        a POSIX shell they are removed by a few "rm" commands instead
+        of a request per file. Files which don't exist are skipped.
+
+        Parameters
+        ----------
+        remote_file_paths: list
+            Paths (str or Path) of the files to remove.
+        """
+        paths = [self._resolve(path) for path in remote_file_paths]
+        if self._remote_check('command -v rm'):
+            return self._remove_paths(paths)
+        for path in paths:
+            if self.file_exists(path):
+                self.delete_file(path)
+
+    def stat_multiple(self, remote_file_paths: list) -> list:
+        """
+        Retrieves attributes of many remote files. On machines with
+        a POSIX shell (and GNU or BusyBox stat) they are retrieved by
+        a few "stat" commands instead of a request per file. Retrieved
+        attributes are put into the stat cache.
+
+        Parameters
+        ----------
+        remote_file_paths: list
+            Paths (str or Path) of the files to get attributes of.
+
+        Returns
+        ----------
+        list
+            FileAttributes of the files in the same order as the paths,
+            None for files which don't exist.
+        """
+        paths = [self._resolve(path) for path in remote_file_paths]
+        if not self._remote_check('stat -L -c %s /'):
+            return [self.get_file_attributes(path)
+                    if self.file_exists(path) else None for path in paths]
+
+        # Output lines of names with newlines can't be told apart, so
+        # such files are stat'ed one by one
+        batched = [path for path in paths if '\n' not in path.as_posix()]
+        found = {}
+        for command in self._batch_commands(
+                "stat -L -c '%s:%Y:%X:%f:%n' --", batched):
+            # Missing files make stat fail, but the others are printed
+            _, output, _ = self._run(command)
+            for line in output.decode(errors='surrogateescape').splitlines():
+                size, mtime, atime, mode, name = line.split(':', 4)
+                stats = paramiko.SFTPAttributes()
+                stats.st_size = int(size)
+                stats.st_mtime = int(mtime)
+                stats.st_atime = int(atime)
+                stats.st_mode = int(mode, 16)
+                found[name] = stats
+
+        result = []
+        for path in paths:
+            posix_path = path.as_posix()
+            if '\n' in posix_path:
+                result.append(self.get_file_attributes(path)
+                              if self.file_exists(path) else None)
+                continue
+            stats = found.get(posix_path)
+            if stats is None:
+                self._stat_cache_put(path, False)
+                result.append(None)
+            else:
+                attributes = self.convert_to_fileattributes(stats, path)
+                self._stat_cache_put(path, True, copy(attributes))
+                result.append(attributes)
+        return result
+
+    def _delete_directory_files(self, remote_directory_path: Path,
+                                files: list):
+        if self._remote_check('command -v rm'):
+            return self._remove_paths(files)
+        return super()._delete_directory_files(remote_directory_path, files)
+
+    def send_directory(self, local_directory_path: Union[str, Path],
+                       remote_path_to_save: Union[str, Path],
+                       create_parents: bool = False, concurrency: int = 1):
+        if not self._remote_check('command -v tar'):
+            return super().send_directory(local_directory_path,
+                                          remote_path_to_save,
+                                          create_parents, concurrency)
+
+        remote_path_to_save = self._resolve(remote_path_to_save)
+        if create_parents:
+            self.create_directory(remote_path_to_save.parent,
+                                  create_parents=create_parents, exist_ok=True)
+        self.create_directory(remote_path_to_save)
+        # Ownership isn't restored (-o), like with files sent over SFTP
+        command = 'tar -x -o -f - -C ' + \
+                  shlex.quote(remote_path_to_save.as_posix())
+        try:
+            with self._client() as client:
+                channel = self._exec(client, command)
+                try:
+                    # Symlinks are followed, as send_file() does. Only
+                    # the contents are archived, so that the mode and
+                    # time of the existing target directory are kept.
+                    with channel.makefile('wb') as stream, \
+                            tarfile.open(fileobj=stream, mode='w|',
+                                         bufsize=_LOCAL_BUFFER_SIZE,
+                                         dereference=True) as archive, \
+                            os.scandir(local_directory_path) as entries:
+                        for entry in entries:
+                            archive.add(entry.path, arcname=entry.name)
+                    channel.shutdown_write()
+                    status = channel.recv_exit_status()
+                    errors = channel.makefile_stderr('rb').read()
+                finally:
+                    channel.close()
+        finally:
+            self._stat_cache_invalidate(remote_path_to_save, recursive=True)
+        if status:
+            raise NotPerformedException(
+                f"Couldn't send directory to a path {remote_path_to_save}. "
+                f"{errors.decode(errors='replace').strip()}")
+
+    def get_directory_fast(self, remote_directory_path: Union[str, Path],
+                           local_path_to_save: Union[str, Path]):
+        """
+        Retrieves a directory from the remote storage to local as one
+        tar archive streamed through a single SSH channel. Unlike
+        get_directory(), all files are transferred, even if local files
+        of the same size exist. Symlinks are skipped, as get_directory()
+        does, while hard links are kept. Machines without tar (e.g. Windows
+        ones) get the directory with get_directory().
+
+        Parameters
+        ----------
+        remote_directory_path: Union[str, Path]
+            Path to the remote directory to transfer to the local machine.
+        local_path_to_save: Union[str, Path]
+            Path on the local storage to put the remote directory.
+        """
+        if not os.path.exists(local_path_to_save):
+            raise FileNotFound(f'There is no local directory '
+                               f'with path {local_path_to_save}.')
+        if not self._remote_check('command -v tar'):
+            return self.get_directory(remote_directory_path,
+                                      local_path_to_save)
+        if not self.file_exists(remote_directory_path):
+            raise FileNotFound(f"Directory with such path "
+                               f"({remote_directory_path}) doesn't "
+                               f"exists on the remote storage.")
+
+        remote_directory_path = self._resolve(remote_directory_path)
+        command = 'tar -c -f - -C ' + \
+                  shlex.quote(remote_directory_path.as_posix()) + ' .'
+        with self._client() as client:
+            channel = self._exec(client, command)
+            try:
+                try:
+                    with channel.makefile('rb') as stream:
+                        self._extract_tar(stream, local_path_to_save)
+                except tarfile.TarError as error:
+                    status, errors = -1, str(error).encode()
+                else:
+                    status = channel.recv_exit_status()
+                    errors = channel.makefile_stderr('rb').read()
+            finally:
+                channel.close()
+        if status:
+            raise NotPerformedException(
+                f"Couldn't get directory with such path: "
+                f"{remote_directory_path}. "
+                f"{errors.decode(errors='replace').strip()}")
+
+    @classmethod
+    def _extract_tar(cls, stream: BinaryIO,
+                     local_path_to_save: Union[str, Path]):
+        """
+        Extracts regular files, directories and hard links (tar stores
+        every name of a file after the first one as a link) of the tar
+        stream into the local directory. Other members are skipped.
+        """
+        # The 'data' filter (Python 3.12 and security backports) rejects
+        # unsafe members itself, otherwise they are checked here
+        extract_kwargs = {'filter': 'data'} \
+            if hasattr(tarfile, 'data_filter') else {}
+        with tarfile.open(fileobj=stream, mode='r|',
+                          bufsize=_LOCAL_BUFFER_SIZE) as archive:
+            for member in archive:
+                if not (member.isfile() or member.isdir()
+                        or member.islnk()) or \
+                        os.path.normpath(member.name) == '.':
+                    continue
+                if not extract_kwargs:
+                    cls._check_tar_member(member)
+                archive.extract(member, local_path_to_save,
+                                **extract_kwargs)
+
+    @staticmethod
+    def _check_tar_member(member: tarfile.TarInfo):
+        """
+        Makes sure the archive member (and the target of a hard link)
+        is extracted inside the destination directory.
+        """
+        names = (member.name, member.linkname) if member.islnk() \
+            else (member.name,)
+        for name in names:
+            if name.startswith('/') or '..' in name.split('/'):
+                raise NotPerformedException(f"Archive member {name} is "
+                                            f"outside of the directory.")
 
     def _send_file_object(self, file_object: BinaryIO,
                           remote_path_to_save: Path,
                           **kwargs):
+        kwargs.setdefault('confirm', self._confirm)
         try:
-            self._connection.putfo(file_object,
-                                   remote_path_to_save.as_posix(), **kwargs)
+            with self._client() as client:
+                client.putfo(file_object, remote_path_to_save.as_posix(),
+                             **kwargs)
         except IOError as error:
             raise NotPerformedException(
                 f"Couldn't send file to a dictionary with such "
                 f"path: {remote_path_to_save}. {error}")
 
     def _get_file_to_object(self, remote_file_path: Path,
-                            file_object: BinaryIO, **kwargs):
+                            file_object: BinaryIO, callback: Callable = None,
+                            prefetch: bool = True, **kwargs):
+        if kwargs:
+            # getfo() rejected unknown arguments, so they still aren't
+            # silently ignored (whatever the paramiko version is)
+            raise TypeError(f"_get_file_to_object() got unexpected "
+                            f"keyword arguments: {', '.join(kwargs)}")
+        # Prefetching needs the current size of the file, as reads past
+        # the end of it fail, so the open file is stat'ed (a round trip
+        # like the stat of the path getfo() makes). Without prefetching
+        # only the callback needs a size, and one cached by a listing
+        # or get_file_attributes() costs nothing.
+        file_size = None
+        if not prefetch:
+            cached = self._stat_cache_get(remote_file_path)
+            if cached is not None and cached[1] is not None:
+                file_size = cached[1].size
         try:
-            return self._connection.getfo(remote_file_path.as_posix(),
-                                          file_object, **kwargs)
+            with self._client() as client, \
+                    client.open(remote_file_path.as_posix(),
+                                'rb') as remote_file:
+                if file_size is None and (prefetch or callback is not None):
+                    file_size = remote_file.stat().st_size
+                if prefetch and _SFTP_PREFETCH_LIMIT:
+                    remote_file.prefetch(
+                        file_size, max_concurrent_requests=self._max_requests
+                    )
+                elif prefetch:
+                    remote_file.prefetch(file_size)
+                return _copy_stream(
+                    remote_file, file_object, self._block_size,
+                    None if callback is None
+                    else lambda size: callback(size, file_size)
+                )
         except IOError as error:
             raise NotPerformedException(f"Couldn't get file with such path: "
                                         f"{remote_file_path}. {error}")
 
+    def _send_file_path(self, local_file_path: Union[str, os.PathLike],
+                        remote_path_to_save: Path, **kwargs):
+        kwargs.setdefault('confirm', self._confirm)
+        try:
+            with self._client() as client:
+                client.put(os.fspath(local_file_path),
+                           remote_path_to_save.as_posix(), **kwargs)
+        except IOError as error:
+            raise NotPerformedException(
+                f"Couldn't send file to a dictionary with such "
+                f"path: {remote_path_to_save}. {error}")
+
+    def _get_file_to_path(self, remote_file_path: Path,
+                          local_file_path: Union[str, os.PathLike],
+                          callback: Callable = None, prefetch: bool = True,
+                          **kwargs) -> int:
+        if not _SFTP_GET_PREFETCH_LIMIT:
+            # paramiko < 3.3 can't limit the prefetch requests of get(),
+            # the handle is prefetched by _get_file_to_object() instead
+            return super()._get_file_to_path(remote_file_path,
+                                             local_file_path,
+                                             callback=callback,
+                                             prefetch=prefetch, **kwargs)
+        try:
+            with self._client() as client:
+                client.get(
+                    remote_file_path.as_posix(), os.fspath(local_file_path),
+                    callback=callback, prefetch=prefetch,
+                    max_concurrent_prefetch_requests=self._max_requests,
+                    **kwargs
+                )
+        except IOError as error:
+            raise NotPerformedException(f"Couldn't get file with such path: "
+                                        f"{remote_file_path}. {error}")
+        return os.stat(local_file_path).st_size
+
     def _file_exists(self, remote_file_path: Path, **kwargs):
         try:
             self._connection.stat(remote_file_path.as_posix())
@@ -977,6 +2554,45 @@ class SSHConnection(RemoteStorageConnection):
             raise NotPerformedException(f"Couldn't delete a file with such "
                                         f"path: {remote_file_path}. {error}")
 
+    def delete_file_if_exists(self, remote_file_path: Union[str, Path],
+                              **kwargs) -> bool:
+        # The file is just removed, a missing one makes the server
+        # answer "no such file" instead of an existence check going first
+        remote_file_path = self._resolve(remote_file_path)
+        try:
+            self._connection.remove(remote_file_path.as_posix())
+        except FileNotFoundError:
+            return False
+        except IOError as error:
+            raise NotPerformedException(f"Couldn't delete a file with such "
+                                        f"path: {remote_file_path}. {error}")
+        finally:
+            self._stat_cache_invalidate(remote_file_path)
+        return True
+
+    def create_directory_if_missing(self,
+                                    new_directory_path: Union[str, Path],
+                                    create_parents: bool = False,
+                                    **kwargs) -> bool:
+        if create_parents:
+            return super().create_directory_if_missing(
+                new_directory_path, create_parents, **kwargs)
+        # mkdir goes first, the existence is checked only if it fails,
+        # as SFTP servers give no distinct error for existing directories
+        new_directory_path = self._resolve(new_directory_path)
+        posix_path = new_directory_path.as_posix()
+        try:
+            self._create_directory(new_directory_path, **kwargs)
+        except NotPerformedException:
+            self._stat_cache_invalidate(new_directory_path)
+            if self.file_exists(new_directory_path):
+                return False
+            raise
+        finally:
+            self._stat_cache_invalidate(new_directory_path)
+        self._remember_directory(posix_path)
+        return True
+
     def _get_file_attributes(self, remote_file_path: Path,
                              **kwargs):
         try:
@@ -989,21 +2605,17 @@ class SSHConnection(RemoteStorageConnection):
 
     def _create_directory(self, new_directory_path: Path,
                           mode: int = 777):
-        posix_modes = {
-            666: 438,
-            660: 432,
-            644: 420,
-            600: 384,
-            777: 511,
-            700: 448,
-            70: 56
-        }
-        if mode not in posix_modes:
-            raise NotPerformedException(f"Mode {mode} is not supported "
-                                        f"by the lib.")
+        mode_bits = _POSIX_MODES.get(mode)
+        if mode_bits is None:
+            # Other modes are parsed from the same octal-looking decimal
+            # spelling (e.g. 755), anything else is rejected
+            digits = str(mode) if type(mode) is int else ''
+            if not 0 < len(digits) <= 3 or digits.strip('01234567'):
+                raise NotPerformedException(f"Mode {mode} is not supported "
+                                            f"by the lib.")
+            mode_bits = int(digits, 8)
         try:
-            self._connection.mkdir(new_directory_path.as_posix(),
-                                   posix_modes[mode])
+            self._connection.mkdir(new_directory_path.as_posix(), mode_bits)
         except IOError as error:
             raise NotPerformedException(f"Couldn't create a dictionary with "
                                         f"such path: {new_directory_path}. "
@@ -1025,29 +2637,16 @@ class SSHConnection(RemoteStorageConnection):
         except IOError as error:
             raise NotPerformedException(f"Couldn't list files in the path: "
                                         f"{remote_directory_path}. {error}")
-        result = []
-        for file_object in path_list:
-            result.append(
-                self.convert_to_fileattributes(file_object,
-                                               Path(remote_directory_path,
-                                                    file_object.filename)))
-        return result
+        convert = self.convert_to_fileattributes
+        return [convert(file_object,
+                        remote_directory_path / file_object.filename)
+                for file_object in path_list]
 
     def convert_to_fileattributes(self, file_object,
                                   remote_file_path: Union[str, Path]):
-        remote_file_path = Path(remote_file_path)
-        result = {
-            'name': remote_file_path.name,
-            'size': file_object.st_size,
-            'type': 'directory' if S_ISDIR(file_object.st_mode) else 'file',
-            'path': str(remote_file_path),
-            'absolute_path': str(Path(self._work_dir, remote_file_path)),
-            'modification_time': datetime.fromtimestamp(file_object.st_mtime),
-            'last_access_time': datetime.fromtimestamp(file_object.st_atime),
-            'create_time': datetime.fromtimestamp(file_object.st_ctime) \
-                if hasattr(file_object, 'st_ctime') else None
-        }
-        return FileAttributes(**result)
+        remote_file_path = _as_path(remote_file_path)
+        return _stat_to_fileattributes(file_object, remote_file_path,
+                                       self._absolute_path(remote_file_path))
 
 
 class LocalStorage(RemoteStorageConnection):
@@ -1066,12 +2665,12 @@ class LocalStorage(RemoteStorageConnection):
     def _send_file_object(self, file_object: BinaryIO,
                           remote_path_to_save: Path, **kwargs):
         with open(remote_path_to_save, "wb") as destination_file:
-            destination_file.write(file_object.read())
+            _copy_file(file_object, destination_file, self.chunk_size)
 
     def _get_file_to_object(self, remote_file_path: Path,
                             file_object: BinaryIO, **kwargs):
         with open(remote_file_path, 'rb') as file:
-            file_object.write(file.read())
+            return _copy_file(file, file_object, self.chunk_size)
 
     def _file_exists(self, remote_file_path: Path, **kwargs):
         return os.path.exists(remote_file_path)
@@ -1094,29 +2693,95 @@ class LocalStorage(RemoteStorageConnection):
 
     def _list_path(self, remote_directory_path: Path = '',
                    **kwargs):
-        result = []
-        for file in os.listdir(remote_directory_path):
-            result.append(
-                self.convert_to_fileattributes(
-                    os.stat(Path(remote_directory_path, file)),
-                    Path(remote_directory_path, file)
-                )
-            )
-        return result
+        convert = self.convert_to_fileattributes
+        # scandir() entries are stat'ed by their ready paths (on Windows
+        # the stats come with the listing), symlinks are followed
+        # as os.stat() did
+        with os.scandir(remote_directory_path) as entries:
+            return [convert(entry.stat(), remote_directory_path / entry.name)
+                    for entry in entries]
 
     def convert_to_fileattributes(self, file_object,
                                   remote_file_path: Union[str, Path]):
-        remote_file_path = Path(remote_file_path)
-        result = {
-            'name': remote_file_path.name,
-            'size': file_object.st_size,
-            'type': 'directory' if S_ISDIR(file_object.st_mode) else 'file',
-            'path': str(remote_file_path),
-            'absolute_path': str(Path(self._work_dir, remote_file_path)),
-            'modification_time': datetime.fromtimestamp(file_object.st_mtime),
-            'last_access_time': datetime.fromtimestamp(file_object.st_atime),
-            'create_time': datetime.fromtimestamp(file_object.st_ctime) \
-                if hasattr(file_object, 'st_ctime') else None
-        }
-        return FileAttributes(**result)
+        remote_file_path = _as_path(remote_file_path)
+        return _stat_to_fileattributes(file_object, remote_file_path,
+                                       self._absolute_path(remote_file_path))
+
+
+class AsyncConnectionMixin:
+    """
+    Adds coroutine versions of the main blocking methods to
+    a connection class. Every one runs the method in the default
+    executor of the running event loop, so that the loop isn't blocked
+    by file I/O. The connection must support being used from several
+    threads.
+    """
+
+    async def _run_blocking(self, method: Callable, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None,
+                                          partial(method, *args, **kwargs))
+
+    async def aread_file(self, remote_file_path: Union[str, Path],
+                         **kwargs) -> bytes:
+        """
+        Coroutine returning contents of the remote file.
+        """
+        def read():
+            buffer = BytesIO()
+            self.get_file(remote_file_path, buffer, **kwargs)
+            return buffer.getvalue()
+        return await self._run_blocking(read)
+
+    async def awrite_file(self, remote_file_path: Union[str, Path],
+                          file_contents: Union[str, bytes, bytearray,
+                                               IO] = None,
+                          create_parents: bool = False) -> int:
+        """
+        Coroutine version of create_file().
+        """
+        return await self._run_blocking(self.create_file, remote_file_path,
+                                        file_contents, create_parents)
+
+    async def aget_file(self, remote_file_path: Union[str, Path],
+                        where_to_put: Union[str, Path, IO],
+                        create_parents: bool = False, **kwargs) -> int:
+        """
+        Coroutine version of get_file().
+        """
+        return await self._run_blocking(self.get_file, remote_file_path,
+                                        where_to_put, create_parents,
+                                        **kwargs)
+
+    async def asend_file(self, local_file: Union[str, Path, IO],
+                         remote_path_to_save: Union[str, Path],
+                         create_parents: bool = False, **kwargs):
+        """
+        Coroutine version of send_file().
+        """
+        return await self._run_blocking(self.send_file, local_file,
+                                        remote_path_to_save, create_parents,
+                                        **kwargs)
+
+    async def alist_path(self, remote_directory_path: Union[str, Path] = '',
+                         **kwargs) -> list:
+        """
+        Coroutine version of list_path().
+        """
+        return await self._run_blocking(self.list_path,
+                                        remote_directory_path, **kwargs)
+
+    async def aget_file_attributes(self, remote_file_path: Union[str, Path],
+                                   **kwargs) -> FileAttributes:
+        """
+        Coroutine version of get_file_attributes().
+        """
+        return await self._run_blocking(self.get_file_attributes,
+                                        remote_file_path, **kwargs)
 
+
+class AsyncLocalStorage(AsyncConnectionMixin, LocalStorage):
+    """
+    LocalStorage with coroutine versions of its methods
+    (see AsyncConnectionMixin).
+    """
@@ -1,3 +1,5 @@
+import os
+import copy
 import pathlib
 from unittest import TestCase
 from datetime import datetime
@@ -53,6 +55,97 @@ class TestFileAttrubutes(TestCase):
         self.assertEqual(valid_data, test_object.to_dict())
         self.assertEqual(valid_data, dict(test_object))
 
+    def test_from_row(self):
+        valid_data = {
+            'name': 'something',
+            'size': 1,
+            'type': 'file',
+            'path': '/test/something',
+            'absolute_path': '/home/debian/test/something',
+            'modification_time': datetime.fromtimestamp(123),
+            'last_access_time': datetime.fromtimestamp(124),
+            'create_time': None
+        }
+        test_object = FileAttributes(**valid_data)
+        self.assertEqual(FileAttributes.from_row(*valid_data.values()),
+                         test_object)
+        self.assertEqual(FileAttributes.from_dict(valid_data), test_object)
+        self.assertEqual(FileAttributes.from_dict(test_object.to_dict()),
+                         test_object)
+        self.assertTrue(FileAttributes.from_dict(valid_data).is_file())
+
+    def test_timestamps(self):
+        test_object = FileAttributes('something', 1, 'file',
+                                     '/test/something', '/test/something',
+                                     modification_time=123,
+                                     last_access_time='2021-01-01T10:00:00Z',
+                                     create_time=None)
+        self.assertEqual(test_object.modification_time,
+                         datetime.fromtimestamp(123))
+        self.assertEqual(test_object.last_access_time,
+                         datetime.fromisoformat('2021-01-01T10:00:00+00:00'))
+        self.assertIsNone(test_object.create_time)
+
+        test_object.create_time = '2021-01-01 10:00:00'
+        self.assertEqual(test_object.create_time, datetime(2021, 1, 1, 10))
+
+        test_object = FileAttributes('something', 1, 'file',
+                                     '/test/something', '/test/something',
+                                     modification_time='something',
+                                     last_access_time=124)
+        with self.assertRaises(ValueError):
+            test_object.modification_time
+
+    def test_equality(self):
+        valid_data = {
+            'name': 'something',
+            'size': 1,
+            'type': 'file',
+            'path': '/test/something',
+            'absolute_path': '/home/debian/test/something',
+            'modification_time': datetime.fromtimestamp(123),
+            'last_access_time': datetime.fromtimestamp(124),
+            'create_time': None
+        }
+        test_object = FileAttributes(**valid_data)
+        self.assertEqual(test_object, FileAttributes(**valid_data))
+        self.assertEqual(len({test_object, FileAttributes(**valid_data)}), 1)
+        self.assertNotEqual(test_object,
+                            FileAttributes(**{**valid_data, 'size': 2}))
+        self.assertNotEqual(test_object,
+                            FileAttributes(**{**valid_data,
+                                              'path': '/test/Something'}))
+        self.assertNotEqual(test_object, valid_data)
+
+        other_object = FileAttributes(**valid_data)
+        self.assertEqual(test_object, other_object)
+        for field, value in (('name', 'other'), ('size', 99),
+                             ('path', '/test/other'),
+                             ('absolute_path', '/home/debian/other')):
+            changed_object = FileAttributes(**valid_data)
+            self.assertEqual(changed_object, other_object)
+            setattr(changed_object, field, value)
+            self.assertNotEqual(changed_object, other_object)
+            self.assertEqual(changed_object,
+                             FileAttributes(**{**valid_data, field: value}))
+            self.assertEqual(hash(changed_object),
+                             hash(FileAttributes(**{**valid_data,
+                                                    field: value})))
+
+    def test_copy(self):
+        test_object = FileAttributes('something', 1, 'file',
+                                     '/test/something', '/test/something',
+                                     123, 124)
+        copied_object = copy.copy(test_object)
+        self.assertIsNot(copied_object, test_object)
+        self.assertEqual(copied_object, test_object)
+        self.assertEqual(dict(copied_object), dict(test_object))
+        copied_object.size = 2
+        copied_object.type = 'directory'
+        self.assertEqual(test_object.size, 1)
+        self.assertTrue(test_object.is_file())
+        self.assertNotEqual(copied_object, test_object)
+
 
 class TestPath(TestCase):
     def test_init(self):
@@ -93,5 +186,57 @@ class TestPath(TestCase):
         test_object = Path('', '/home/debian/test')
         self.assertEqual(test_object.as_posix(), '/home/debian/test')
 
-
-
+    def test_parents(self):
+        test_object = Path('/home/debian/test.txt')
+        self.assertIsInstance(test_object.parent, Path)
+        self.assertEqual(test_object.parent.as_posix(), '/home/debian')
+        self.assertEqual([parent.as_posix()
+                          for parent in test_object.parents],
+                         ['/home/debian', '/home', '/'])
+        self.assertEqual(len(test_object.parents), 3)
+        self.assertEqual(test_object.parents[-1].as_posix(), '/')
+        self.assertEqual([parent.as_posix()
+                          for parent in reversed(test_object.parents)],
+                         ['/', '/home', '/home/debian'])
+
+        test_object = Path('inner_folder/test.txt')
+        self.assertEqual([parent.as_posix()
+                          for parent in test_object.parents],
+                         ['inner_folder'])
+        self.assertEqual(len(Path('test.txt').parents), 0)
+        self.assertEqual(Path('test.txt').parents, [])
+        self.assertEqual(Path('test.txt').parents[1:], [])
+
+        self.assertNotEqual(Path('test.txt').parents, ())
+
+        # Parents compare and slice as the list they used to be
+        parents = Path('/home/debian/test.txt').parents
+        self.assertIsInstance(parents[1:], list)
+        self.assertEqual([parent.as_posix() for parent in parents[1:]],
+                         ['/home', '/'])
+        self.assertEqual(parents[:0], [])
+        self.assertNotEqual(parents, [])
+        self.assertEqual(Path('/').parents, Path('test.txt').parents)
+        self.assertEqual(Path(test_object).as_posix(),
+                         test_object.as_posix())
+
+    def test_methods(self):
+        test_object = Path('E:\\folder\\file.txt')
+        self.assertIsInstance(test_object, os.PathLike)
+        self.assertFalse(hasattr(test_object, '__dict__'))
+        self.assertEqual(os.fspath(test_object), 'E:/folder/file.txt')
+        self.assertEqual((test_object.drive, test_object.name,
+                          test_object.stem, test_object.suffix),
+                         ('E:', 'file.txt', 'file', '.txt'))
+        self.assertEqual(test_object.with_name('other.txt').as_posix(),
+                         'E:/folder/other.txt')
+        self.assertEqual(test_object.relative_to('E:\\').as_posix(),
+                         'folder/file.txt')
+        self.assertTrue(test_object.is_absolute())
+        self.assertTrue(test_object.match('*.txt'))
+
+    def test_truediv(self):
+        test_object = Path('/home') / 'user' / Path('file.txt')
+        self.assertIsInstance(test_object, Path)
+        self.assertEqual(test_object.as_posix(), '/home/user/file.txt')
+        self.assertEqual((Path('/home') / '/etc').as_posix(), '/etc')
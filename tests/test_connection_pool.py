@@ -0,0 +1,73 @@
+from unittest import TestCase
+
+from src.rsс.connections import ConnectionPool
+
+
+class Session:
+
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class Pool(ConnectionPool):
+    _session_class = Session
+
+
+class OtherPool(Pool):
+    pass
+
+
+class TestConnectionPool(TestCase):
+
+    def tearDown(self):
+        ConnectionPool.close_all()
+
+    def test_shared_pools(self):
+        pool = Pool.get_pool(('host', 'user'), Session)
+        self.assertIs(Pool.get_pool(('host', 'user'), Session), pool)
+        self.assertIsNot(Pool.get_pool(('host', 'other'), Session), pool)
+        self.assertIsNot(OtherPool.get_pool(('host', 'user'), Session), pool)
+
+    def test_detach(self):
+        pool = Pool.get_pool(('host', 'user'), Session)
+        Pool.get_pool(('host', 'user'), Session)
+        with pool.acquire() as session:
+            pass
+        self.assertFalse(session.closed)
+
+        pool.detach()
+        self.assertFalse(session.closed)
+        self.assertIs(Pool.get_pool(('host', 'user'), Session), pool)
+        pool.detach()
+        pool.detach()
+        self.assertTrue(session.closed)
+        self.assertIsNot(Pool.get_pool(('host', 'user'), Session), pool)
+
+    def test_close_all(self):
+        pool = Pool.get_pool(('host', 'user'), Session)
+        other_pool = OtherPool.get_pool(('host', 'user'), Session)
+        with pool.acquire() as session, \
+                other_pool.acquire() as other_session:
+            pass
+
+        OtherPool.close_all()
+        self.assertTrue(other_session.closed)
+        self.assertFalse(session.closed)
+        self.assertIs(Pool.get_pool(('host', 'user'), Session), pool)
+
+        Pool.close_all()
+        self.assertTrue(session.closed)
+        self.assertIsNot(Pool.get_pool(('host', 'user'), Session), pool)
+
+    def test_close_with_borrowed_sessions(self):
+        pool = Pool(Session)
+        with pool.acquire() as session:
+            with pool.acquire() as idle_session:
+                pass
+            pool.close()
+            self.assertTrue(idle_session.closed)
+            self.assertFalse(session.closed)
+        self.assertTrue(session.closed)
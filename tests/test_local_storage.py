@@ -0,0 +1,443 @@
+import os
+import errno
+import shutil
+import asyncio
+import tempfile
+from io import BytesIO, StringIO
+from time import sleep
+from unittest import TestCase, skipUnless
+from unittest.mock import patch
+
+from src.rsс.base import Path
+from src.rsс.connections import LocalStorage, AsyncLocalStorage, \
+    _KERNEL_COPIES, _copy_file, _copy_file_range
+from src.rsс.exceptions import FileExists, FileNotFound
+
+
+class RacingDict(dict):
+    """
+    Dictionary which loses its items right after they are read,
+    as if another thread removed them.
+    """
+
+    def get(self, key, default=None):
+        value = super().get(key, default)
+        self.clear()
+        return value
+
+    def __iter__(self):
+        keys = list(super().__iter__())
+        self.clear()
+        return iter(keys)
+
+
+class LocalStorageTestCase(TestCase):
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        self.connection = LocalStorage(work_dir=self.work_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    def local_path(self, *parts):
+        return os.path.join(self.work_dir, *parts)
+
+    def write(self, contents, *parts):
+        os.makedirs(os.path.dirname(self.local_path(*parts)), exist_ok=True)
+        with open(self.local_path(*parts), 'wb') as file:
+            file.write(contents)
+
+    def read(self, *parts):
+        with open(self.local_path(*parts), 'rb') as file:
+            return file.read()
+
+
+class TestResolve(TestCase):
+
+    def test_join_posix(self):
+        paths = ('', 'a', 'a/b', 'a/b/', '/a/b', 'a\\b', 'a//b', './a',
+                 'a/../b', 'C:\\a', Path('a', 'b'), Path('/a'))
+        for work_dir in ('', '.', '/srv/data', '/srv/data/', 'rel',
+                         'rel/dir', 'E:\\', 'E:\\data'):
+            connection = LocalStorage(work_dir=work_dir)
+            for path in paths:
+                self.assertEqual(connection._join_posix(path),
+                                 Path(work_dir, path).as_posix(),
+                                 (work_dir, path))
+
+    def test_resolve_once(self):
+        connection = LocalStorage(work_dir='/srv/data')
+        resolved = connection._resolve('a/b')
+        self.assertEqual(resolved.as_posix(), '/srv/data/a/b')
+        self.assertIs(connection._resolve(resolved), resolved)
+        self.assertEqual(connection._resolve(resolved / 'c').as_posix(),
+                         '/srv/data/a/b/c')
+        self.assertEqual(connection._resolve(resolved.parent).as_posix(),
+                         '/srv/data/a')
+
+    def test_relative_work_dir(self):
+        work_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, work_dir, ignore_errors=True)
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(work_dir)
+        os.makedirs(os.path.join('rel', 'tree', 'sub'))
+        with open(os.path.join('rel', 'tree', 'sub', 'file.txt'), 'w') as file:
+            file.write('123')
+        connection = LocalStorage(work_dir='rel')
+
+        directory, = connection.list_path('tree')
+        self.assertEqual(directory.path.as_posix(), 'rel/tree/sub')
+        self.assertEqual(directory.absolute_path.as_posix(), 'rel/tree/sub')
+        file, = connection.list_path(directory.path)
+        self.assertEqual(connection.get_file_attributes(file.path).size, 3)
+
+        connection.delete_directory(directory.path, recursive=True)
+        self.assertFalse(os.path.exists(os.path.join('rel', 'tree', 'sub')))
+
+
+class TestCreateDirectory(LocalStorageTestCase):
+
+    def test_known_directories_expire(self):
+        self.connection.stat_cache_ttl = 0.05
+        self.connection.create_directory('a/b', create_parents=True)
+        shutil.rmtree(self.local_path('a'))
+        sleep(0.1)
+
+        self.connection.create_directory('a/b', create_parents=True,
+                                         exist_ok=True)
+        self.assertTrue(os.path.isdir(self.local_path('a', 'b')))
+
+        shutil.rmtree(self.local_path('a'))
+        sleep(0.1)
+        self.connection.send_file_object(BytesIO(b'123'), 'a/b/c.txt',
+                                         create_parents=True)
+        self.assertTrue(os.path.isfile(self.local_path('a', 'b', 'c.txt')))
+
+    def test_known_directories_dropped_concurrently(self):
+        self.connection.create_directory('a/b', create_parents=True)
+        self.connection._known_dirs = RacingDict(
+            dict.fromkeys(self.connection._known_dirs, 0))
+        self.assertFalse(self.connection._is_known_directory(
+            self.connection._join_posix('a')))
+
+        self.connection.create_directory('a/c')
+        self.connection._known_dirs = RacingDict(
+            self.connection._known_dirs)
+        self.connection._forget_directories(self.connection._join_posix('a'))
+        self.assertFalse(self.connection._known_dirs)
+
+    def test_existing_directory_is_checked(self):
+        self.connection.create_directory('a')
+        with self.assertRaises(FileExists):
+            self.connection.create_directory('a')
+        self.assertFalse(self.connection.create_directory('a',
+                                                          exist_ok=True))
+
+        self.connection.stat_cache_ttl = 0
+        self.connection.create_directory('b')
+        os.rmdir(self.local_path('b'))
+        self.connection.create_directory('b')
+        self.assertTrue(os.path.isdir(self.local_path('b')))
+
+
+class TestStatCache(LocalStorageTestCase):
+
+    def test_results_expire(self):
+        self.connection.stat_cache_ttl = 0.05
+        self.assertFalse(self.connection.file_exists('file.txt'))
+        self.write(b'123', 'file.txt')
+        self.assertFalse(self.connection.file_exists('file.txt'))
+        sleep(0.1)
+        self.assertTrue(self.connection.file_exists('file.txt'))
+
+    def test_disabled(self):
+        self.connection.stat_cache_ttl = 0
+        self.assertFalse(self.connection.file_exists('file.txt'))
+        self.write(b'123', 'file.txt')
+        self.assertTrue(self.connection.file_exists('file.txt'))
+
+    def test_invalidated_by_changes(self):
+        self.assertFalse(self.connection.file_exists('file.txt'))
+        self.connection.create_file('file.txt', '123')
+        self.assertTrue(self.connection.file_exists('file.txt'))
+        self.assertEqual(
+            self.connection.get_file_attributes('file.txt').size, 3)
+        self.connection.create_file('file.txt', '12345')
+        self.assertEqual(
+            self.connection.get_file_attributes('file.txt').size, 5)
+        self.connection.delete_file('file.txt')
+        self.assertFalse(self.connection.file_exists('file.txt'))
+
+    def test_listing_prefetch(self):
+        self.write(b'123', 'dir', 'file.txt')
+        listed, = self.connection.list_path('dir')
+        os.remove(self.local_path('dir', 'file.txt'))
+        self.assertEqual(
+            self.connection.get_file_attributes('dir/file.txt'), listed)
+
+    def test_copies_handed_out(self):
+        self.write(b'123', 'dir', 'file.txt')
+        listed, = self.connection.list_path('dir')
+        listed.size = 10
+        attributes = self.connection.get_file_attributes('dir/file.txt')
+        self.assertEqual(attributes.size, 3)
+        attributes.size = 20
+        attributes.type = 'directory'
+        attributes = self.connection.get_file_attributes('dir/file.txt')
+        self.assertEqual(attributes.size, 3)
+        self.assertTrue(attributes.is_file())
+
+        self.write(b'12345', 'other.txt')
+        attributes = self.connection.get_file_attributes('other.txt')
+        attributes.size = 20
+        self.assertEqual(
+            self.connection.get_file_attributes('other.txt').size, 5)
+
+
+class TestDirectories(LocalStorageTestCase):
+
+    def test_delete_recursive(self):
+        for parts in (('t', 'a.txt'), ('t', 'b', 'c.txt'),
+                      ('t', 'b', 'd', 'e.txt'), ('t', 'f', 'g.txt')):
+            self.write(b'1', *parts)
+        os.makedirs(self.local_path('t', 'empty'))
+        self.assertTrue(self.connection.file_exists('t/b/d/e.txt'))
+
+        self.connection.delete_directory('t', recursive=True)
+        self.assertFalse(os.path.exists(self.local_path('t')))
+        self.assertFalse(self.connection.file_exists('t'))
+        self.assertFalse(self.connection.file_exists('t/b/d/e.txt'))
+
+    def test_send_and_get_directory(self):
+        source = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, source, ignore_errors=True)
+        for index in range(10):
+            path = os.path.join(source, f'dir{index % 3}', f'{index}.txt')
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w') as file:
+                file.write(str(index) * index)
+
+        for concurrency in (1, 4):
+            self.connection.send_directory(source, f'sent{concurrency}',
+                                           concurrency=concurrency)
+            destination = self.local_path(f'got{concurrency}')
+            os.mkdir(destination)
+            self.connection.get_directory(f'sent{concurrency}', destination,
+                                          concurrency=concurrency)
+            for index in range(10):
+                name = os.path.join(f'dir{index % 3}', f'{index}.txt')
+                self.assertEqual(self.read(f'sent{concurrency}', name),
+                                 str(index).encode() * index)
+                self.assertEqual(self.read(f'got{concurrency}', name),
+                                 str(index).encode() * index)
+
+    def test_if_missing_and_if_exists(self):
+        self.assertTrue(self.connection.create_directory_if_missing('a'))
+        self.assertFalse(self.connection.create_directory_if_missing('a'))
+        self.assertTrue(self.connection.create_directory_if_missing(
+            'b/c', create_parents=True))
+        self.assertTrue(os.path.isdir(self.local_path('b', 'c')))
+
+        self.connection.create_file('a/file.txt', '1')
+        self.assertTrue(self.connection.delete_file_if_exists('a/file.txt'))
+        self.assertFalse(self.connection.delete_file_if_exists('a/file.txt'))
+        self.assertFalse(os.path.exists(self.local_path('a', 'file.txt')))
+
+
+class TestCreateFile(LocalStorageTestCase):
+
+    def test_returns_size(self):
+        text = StringIO('абв')
+        text.read(1)
+        data = BytesIO(b'12345')
+        data.read(2)
+        contents = (
+            (None, b''), ('', b''), (b'', b''), ('абв', 'абв'.encode()),
+            (b'123', b'123'), (bytearray(b'1234'), b'1234'),
+            (text, 'абв'.encode()), (data, b'12345'),
+        )
+        for file_contents, expected in contents:
+            self.assertEqual(
+                self.connection.create_file('file.txt', file_contents),
+                len(expected), file_contents)
+            self.assertEqual(self.read('file.txt'), expected, file_contents)
+
+    def test_wrong_type(self):
+        with self.assertRaises(TypeError):
+            self.connection.create_file('file.txt', 123)
+
+
+class TestTransfers(LocalStorageTestCase):
+
+    def test_files_by_path(self):
+        data = os.urandom(3 << 20)
+        source = self.local_path('source.bin')
+        self.write(data, 'source.bin')
+        self.connection.send_file(source, 'sent/file.bin',
+                                  create_parents=True)
+        self.assertEqual(self.read('sent', 'file.bin'), data)
+        self.assertEqual(self.connection.get_file(
+            'sent/file.bin', self.local_path('got', 'file.bin'),
+            create_parents=True), len(data))
+        self.assertEqual(self.read('got', 'file.bin'), data)
+
+        with self.assertRaises(FileNotFound):
+            self.connection.get_file('missing.bin', BytesIO())
+
+    def test_open_remote(self):
+        with self.connection.open_remote('dir/file.txt', 'wb',
+                                         create_parents=True) as file:
+            file.write(b'123')
+            self.assertFalse(os.path.exists(self.local_path('dir')))
+        self.assertEqual(self.read('dir', 'file.txt'), b'123')
+
+        with self.connection.open_remote('dir/file.txt') as file:
+            self.assertEqual(file.read(), b'123')
+
+        with self.assertRaises(RuntimeError):
+            with self.connection.open_remote('other.txt', 'wb') as file:
+                file.write(b'123')
+                raise RuntimeError()
+        self.assertFalse(os.path.exists(self.local_path('other.txt')))
+
+        with self.assertRaises(FileNotFound):
+            with self.connection.open_remote('other.txt'):
+                pass
+        with self.assertRaises(ValueError):
+            with self.connection.open_remote('dir/file.txt', 'r'):
+                pass
+
+    def test_async(self):
+        connection = AsyncLocalStorage(work_dir=self.work_dir)
+
+        async def run():
+            await connection.awrite_file('dir/file.txt', 'абв', True)
+            self.assertEqual(await connection.aread_file('dir/file.txt'),
+                             'абв'.encode())
+            listed, = await connection.alist_path('dir')
+            self.assertEqual(listed.name, 'file.txt')
+            attributes = await connection.aget_file_attributes(
+                'dir/file.txt')
+            self.assertEqual(attributes.size, len('абв'.encode()))
+            await connection.asend_file(BytesIO(b'123'), 'dir/other.txt')
+            got = BytesIO()
+            self.assertEqual(
+                await connection.aget_file('dir/other.txt', got), 3)
+            self.assertEqual(got.getvalue(), b'123')
+
+        asyncio.run(run())
+
+
+class TestSendFile(LocalStorageTestCase):
+
+    def test_rewind(self):
+        for stream in (BytesIO('абв123'.encode()), StringIO('абв123')):
+            stream.read(3 if isinstance(stream, StringIO) else 6)
+            self.connection.send_file(stream, 'rewound.txt')
+            self.assertEqual(self.read('rewound.txt'), 'абв123'.encode())
+
+            stream.seek(3 if isinstance(stream, StringIO) else 6)
+            self.connection.send_file(stream, 'rest.txt', rewind=False)
+            self.assertEqual(self.read('rest.txt'), b'123')
+
+
+class TestCopyFile(LocalStorageTestCase):
+
+    data = bytes(range(256)) * 4096 + b'tail'
+
+    def copy(self, source_mode='rb', destination_mode='wb',
+             source_offset=0, destination_offset=0):
+        with open(self.local_path('source.bin'), source_mode) as source, \
+                open(self.local_path('destination.bin'),
+                     destination_mode) as destination:
+            source.read(source_offset)
+            if destination_offset:
+                destination.read(destination_offset)
+            copied = _copy_file(source, destination)
+            self.assertEqual(source.tell(), len(self.data))
+            # The position of both objects is usable after copying
+            self.assertEqual(source.read(), b'')
+            destination.write(b'end')
+        return copied
+
+    def test_regular_files(self):
+        self.write(self.data, 'source.bin')
+        self.assertEqual(self.copy(), len(self.data))
+        self.assertEqual(self.read('destination.bin'), self.data + b'end')
+
+    def test_partial_source(self):
+        self.write(self.data, 'source.bin')
+        self.assertEqual(self.copy(source_offset=1000),
+                         len(self.data) - 1000)
+        self.assertEqual(self.read('destination.bin'),
+                         self.data[1000:] + b'end')
+
+    def test_append_destination(self):
+        self.write(self.data, 'source.bin')
+        self.write(b'head', 'destination.bin')
+        self.assertEqual(self.copy(destination_mode='ab'), len(self.data))
+        self.assertEqual(self.read('destination.bin'),
+                         b'head' + self.data + b'end')
+
+    def test_update_destination(self):
+        self.write(self.data[:1000], 'source.bin')
+        self.write(b'x' * 2000, 'destination.bin')
+        self.data = self.data[:1000]
+        self.assertEqual(self.copy(destination_mode='r+b',
+                                   destination_offset=10), 1000)
+        self.assertEqual(self.read('destination.bin'),
+                         b'x' * 10 + self.data + b'end' + b'x' * 987)
+
+    def test_empty_file(self):
+        self.data = b''
+        self.write(self.data, 'source.bin')
+        self.assertEqual(self.copy(), 0)
+        self.assertEqual(self.read('destination.bin'), b'end')
+
+    @skipUnless(os.path.isfile('/proc/self/cmdline'), 'requires procfs')
+    def test_file_without_size(self):
+        with open('/proc/self/cmdline', 'rb') as source:
+            expected = source.read()
+        with open('/proc/self/cmdline', 'rb') as source, \
+                open(self.local_path('destination.bin'), 'wb') as destination:
+            self.assertEqual(_copy_file(source, destination), len(expected))
+        self.assertEqual(self.read('destination.bin'), expected)
+
+    def test_fallbacks(self):
+        self.write(self.data, 'source.bin')
+        failures = (
+            {'return_value': 0},
+            {'side_effect': OSError(errno.EXDEV, 'Cross-device link')},
+            {'side_effect': OSError(errno.EINVAL, 'Invalid argument')},
+            {'side_effect': OSError(errno.ENOSYS, 'Not implemented')},
+        )
+        for failure in failures:
+            with patch.object(os, 'copy_file_range', create=True,
+                              **failure):
+                self.assertEqual(self.copy(source_offset=10),
+                                 len(self.data) - 10, failure)
+            self.assertEqual(self.read('destination.bin'),
+                             self.data[10:] + b'end', failure)
+
+            with patch.object(os, 'copy_file_range', create=True,
+                              **failure), \
+                    patch.object(os, 'sendfile', create=True, **failure):
+                self.assertEqual(self.copy(source_offset=10),
+                                 len(self.data) - 10, failure)
+            self.assertEqual(self.read('destination.bin'),
+                             self.data[10:] + b'end', failure)
+
+    @skipUnless(_copy_file_range in _KERNEL_COPIES,
+                'requires copy_file_range')
+    def test_failure_after_copying(self):
+        self.write(self.data, 'source.bin')
+        copy_file_range = os.copy_file_range
+
+        def copy_once(source, destination, count, offset):
+            if offset:
+                raise OSError(errno.EIO, 'Input/output error')
+            return copy_file_range(source, destination, 1000, offset)
+
+        with patch.object(os, 'copy_file_range', side_effect=copy_once):
+            self.assertRaises(OSError, self.copy)
@@ -0,0 +1,67 @@
+from datetime import datetime
+from types import SimpleNamespace
+from unittest import TestCase
+
+from src.rsс.base import Path
+from src.rsс.connections import SMBConnection
+
+
+class Session:
+
+    def __init__(self, files):
+        self.files = files
+        self.listed = []
+
+    def listPath(self, shared_folder, path, **kwargs):
+        self.listed.append((shared_folder, path))
+        return self.files
+
+
+def shared_file(name, size=0, is_directory=False):
+    return SimpleNamespace(filename=name, file_size=size,
+                           isDirectory=is_directory,
+                           last_write_time=0, last_access_time=0,
+                           create_time=0)
+
+
+class TestPaths(TestCase):
+
+    def setUp(self):
+        # The session is replaced, so no SMB server is needed
+        self.connection = SMBConnection.__new__(SMBConnection)
+        self.connection._shared_folder = 'share'
+        self.connection._work_dir = 'work/dir'
+        self.connection._connection = Session([
+            shared_file('.', is_directory=True),
+            shared_file('..', is_directory=True),
+            shared_file('file.txt', 3),
+            shared_file('sub', is_directory=True),
+        ])
+
+    def tearDown(self):
+        # Nothing was pooled, so there is nothing to detach from
+        self.connection._connection = None
+
+    def test_list_path(self):
+        self.connection.stat_cache_ttl = 0
+        self.connection.file_exists = lambda path: True
+        file, directory = self.connection.list_path('tree')
+        self.assertEqual(self.connection._connection.listed,
+                         [('share', 'work/dir/tree')])
+        self.assertEqual(file.path.as_posix(), 'work/dir/tree/file.txt')
+        self.assertEqual(file.absolute_path.as_posix(),
+                         '/work/dir/tree/file.txt')
+        self.assertEqual(file.size, 3)
+        self.assertEqual(directory.absolute_path.as_posix(),
+                         '/work/dir/tree/sub')
+        self.assertEqual(directory.type, 'directory')
+        self.assertIsInstance(file.modification_time, datetime)
+
+    def test_convert_to_fileattributes(self):
+        convert = self.connection.convert_to_fileattributes
+        resolved = self.connection._resolve('tree/file.txt')
+        for path in (resolved, 'tree/file.txt', Path('tree', 'file.txt')):
+            self.assertEqual(
+                convert(shared_file('file.txt', 3), path
+                        ).absolute_path.as_posix(),
+                '/work/dir/tree/file.txt', path)
@@ -0,0 +1,595 @@
+import os
+import errno
+import shutil
+import tarfile
+import tempfile
+from io import BytesIO
+from datetime import datetime
+from stat import S_IFDIR, S_IFREG
+from types import SimpleNamespace
+from contextlib import contextmanager
+from unittest import TestCase
+from unittest.mock import patch
+
+import paramiko
+
+from src.rsс.base import FileAttributes
+from src.rsс.connections import (SSHConnection, SFTPClientPool,
+                                  _SSH_COMMAND_SIZE)
+from src.rsс.exceptions import NotPerformedException, ConnectionFailure
+
+
+def tar_stream(*members) -> BytesIO:
+    """
+    Makes a tar archive of (name, contents) members, where contents
+    are bytes of a file, None for a directory or ('link', target)
+    for a hard link.
+    """
+    stream = BytesIO()
+    with tarfile.open(fileobj=stream, mode='w') as archive:
+        for name, contents in members:
+            member = tarfile.TarInfo(name)
+            if contents is None:
+                member.type = tarfile.DIRTYPE
+                member.mode = 0o755
+                archive.addfile(member)
+            elif isinstance(contents, tuple):
+                member.type = tarfile.LNKTYPE
+                member.linkname = contents[1]
+                archive.addfile(member)
+            else:
+                member.size = len(contents)
+                archive.addfile(member, BytesIO(contents))
+    stream.seek(0)
+    return stream
+
+
+class RemoteFile(BytesIO):
+
+    def __init__(self, client, data):
+        super().__init__(data)
+        self.client = client
+
+    def stat(self):
+        self.client.calls.append(('stat',))
+        return SimpleNamespace(st_size=len(self.getvalue()))
+
+    def prefetch(self, file_size=None, **kwargs):
+        self.client.calls.append(('prefetch', file_size))
+
+
+class Stdin(BytesIO):
+
+    def close(self):
+        # Data written into the channel is kept for the checks
+        pass
+
+
+class Channel:
+    """
+    Session channel running one command, which answers with the
+    (status, output, errors) result set for it.
+    """
+
+    def __init__(self, client):
+        self.client = client
+        self.stdin = Stdin()
+        self.result = (0, b'', b'')
+
+    def exec_command(self, command):
+        self.command = command
+        self.client.calls.append(('exec', command))
+        if self.client.results:
+            self.result = self.client.results.pop(0)
+        self.client.channels.append(self)
+
+    def makefile(self, mode):
+        return self.stdin if 'w' in mode else BytesIO(self.result[1])
+
+    def makefile_stderr(self, mode):
+        return BytesIO(self.result[2])
+
+    def shutdown_write(self):
+        pass
+
+    def recv_exit_status(self):
+        return self.result[0]
+
+    def close(self):
+        pass
+
+
+class Client:
+    """
+    Stands for both the pool and the SFTP client, recording the calls
+    made to it.
+    """
+
+    def __init__(self):
+        self.calls = []
+        self.files = {}
+        self.directories = set()
+        # Results of the next commands and channels they were run in
+        self.results = []
+        self.channels = []
+
+    def get_channel(self):
+        transport = SimpleNamespace(open_session=lambda: Channel(self))
+        return SimpleNamespace(get_transport=lambda: transport)
+
+    def open(self, path, mode):
+        return RemoteFile(self, self.files[path])
+
+    def get(self, remote_path, local_path, callback=None, prefetch=True,
+            max_concurrent_prefetch_requests=None):
+        # paramiko 3.3+ signature
+        self.calls.append(('get', remote_path,
+                           max_concurrent_prefetch_requests))
+        with open(local_path, 'wb') as file:
+            file.write(self.files[remote_path])
+
+    @contextmanager
+    def acquire(self):
+        yield self
+
+    def close(self):
+        pass
+
+    def mkdir(self, path, mode):
+        self.calls.append(('mkdir', path, mode))
+        if path in self.directories or path in self.files:
+            # SFTP servers answer with a generic failure
+            raise IOError('Failure')
+        self.directories.add(path)
+
+    def stat(self, path):
+        self.calls.append(('stat', path))
+        stats = paramiko.SFTPAttributes()
+        stats.st_mtime = stats.st_atime = 100
+        if path in self.directories:
+            stats.st_size, stats.st_mode = 4096, S_IFDIR | 0o755
+        elif path in self.files:
+            stats.st_size = len(self.files[path])
+            stats.st_mode = S_IFREG | 0o644
+        else:
+            raise FileNotFoundError(errno.ENOENT, 'No such file')
+        return stats
+
+    def remove(self, path):
+        self.calls.append(('remove', path))
+        if path not in self.files:
+            raise FileNotFoundError(errno.ENOENT, 'No such file')
+        del self.files[path]
+
+
+class SSHConnectionTestCase(TestCase):
+
+    def setUp(self):
+        # The client is replaced, so no SSH server is needed
+        self.client = Client()
+        self.connection = SSHConnection.__new__(SSHConnection)
+        self.connection._connection = self.client
+        self.connection._work_dir = '/work'
+        self.connection._remote_checks = {}
+        self.connection.stat_cache_ttl = 0
+
+
+class TestCreateDirectory(SSHConnectionTestCase):
+
+    def test_modes(self):
+        for mode, mode_bits in ((777, 0o777), (70, 0o070), (400, 0o400),
+                                (755, 0o755), (5, 0o005)):
+            self.client.directories.clear()
+            self.connection._create_directory(
+                self.connection._resolve('dir'), mode)
+            self.assertEqual(self.client.calls.pop(),
+                             ('mkdir', '/work/dir', mode_bits), mode)
+
+        for mode in (0o755, 800, 1777, -7, '755', None):
+            with self.assertRaises(NotPerformedException, msg=mode):
+                self.connection._create_directory(
+                    self.connection._resolve('dir'), mode)
+        self.assertFalse(self.client.calls)
+
+
+class TestExtractTar(TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        self.destination = os.path.join(self.root, 'destination')
+        os.mkdir(self.destination)
+
+    def read(self, *parts):
+        with open(os.path.join(self.destination, *parts), 'rb') as file:
+            return file.read()
+
+    def extract(self, *members):
+        SSHConnection._extract_tar(tar_stream(*members), self.destination)
+
+    def check_members(self):
+        self.extract(('.', None), ('./a.txt', b'123'), ('./dir', None),
+                     ('./dir/b.txt', ('link', './a.txt')),
+                     ('./c.txt', ('link', './a.txt')))
+        self.assertEqual(self.read('a.txt'), b'123')
+        self.assertEqual(self.read('dir', 'b.txt'), b'123')
+        self.assertEqual(self.read('c.txt'), b'123')
+        self.assertEqual(
+            os.stat(os.path.join(self.destination, 'c.txt')).st_ino,
+            os.stat(os.path.join(self.destination, 'a.txt')).st_ino)
+
+    def check_unsafe_members(self):
+        outside = os.path.join(self.root, 'outside.txt')
+        with open(outside, 'wb') as file:
+            file.write(b'outside')
+        for members in ((('./../outside.txt', b'123'),),
+                        (('./link.txt', ('link', '../outside.txt')),),
+                        (('./link.txt', ('link', outside)),)):
+            with self.assertRaises((NotPerformedException, tarfile.TarError),
+                                   msg=members):
+                self.extract(*members)
+            self.assertFalse(os.path.exists(
+                os.path.join(self.destination, 'link.txt')))
+        with open(outside, 'rb') as file:
+            self.assertEqual(file.read(), b'outside')
+
+        # An absolute name is either refused or put inside the destination
+        absolute = os.path.join(self.root, 'absolute.txt')
+        try:
+            self.extract((absolute, b'123'))
+        except (NotPerformedException, tarfile.TarError):
+            pass
+        self.assertFalse(os.path.exists(absolute))
+
+    def test_members(self):
+        self.check_members()
+
+    def test_unsafe_members(self):
+        self.check_unsafe_members()
+
+    def test_without_data_filter(self):
+        with patch.dict(tarfile.__dict__):
+            tarfile.__dict__.pop('data_filter', None)
+            self.check_members()
+            self.check_unsafe_members()
+
+
+class TestGetFile(SSHConnectionTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.connection._block_size = 2
+        self.connection._max_requests = 8
+        self.connection.stat_cache_ttl = 60
+        self.client.files['/work/file.txt'] = b'123'
+        # The file has shrunk since it was listed
+        path = self.connection._resolve('file.txt')
+        attributes = FileAttributes.from_row('file.txt', 10, 'file',
+                                             path, path, 0, 0)
+        self.connection._stat_cache_put(path, True, attributes)
+
+    def get(self, **kwargs):
+        progress = []
+        destination = BytesIO()
+        self.assertEqual(self.connection.get_file_to_object(
+            'file.txt', destination,
+            callback=lambda *args: progress.append(args), **kwargs), 3)
+        self.assertEqual(destination.getvalue(), b'123')
+        return progress
+
+    def test_prefetch_uses_current_size(self):
+        self.assertEqual(self.get(), [(2, 3), (3, 3)])
+        self.assertEqual(self.client.calls, [('stat',), ('prefetch', 3)])
+
+    def test_cached_size_without_prefetch(self):
+        self.assertEqual(self.get(prefetch=False), [(2, 10), (3, 10)])
+        self.assertEqual(self.client.calls, [])
+
+    def test_get_to_path(self):
+        work_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, work_dir, ignore_errors=True)
+        local_path = os.path.join(work_dir, 'file.txt')
+        for limit, calls in ((True, [('get', '/work/file.txt', 8)]),
+                             (False, [('stat',), ('prefetch', 3)])):
+            with patch('src.rsс.connections._SFTP_GET_PREFETCH_LIMIT',
+                       limit):
+                self.assertEqual(
+                    self.connection.get_file('file.txt', local_path), 3)
+                with open(local_path, 'rb') as file:
+                    self.assertEqual(file.read(), b'123')
+                self.assertEqual(self.client.calls, calls)
+                del self.client.calls[:]
+
+                # Unknown arguments are refused by both ways
+                with self.assertRaises(TypeError):
+                    self.connection.get_file('file.txt', local_path,
+                                             unknown=True)
+
+
+class Transport:
+
+    def __init__(self):
+        self.closed = False
+        self.active = True
+
+    def is_active(self):
+        return self.active
+
+    def close(self):
+        self.closed = True
+
+
+class PooledClient:
+
+    def __init__(self):
+        self.transport = Transport()
+
+    def get_channel(self):
+        return SimpleNamespace(get_transport=lambda: self.transport)
+
+
+class TestClose(SSHConnectionTestCase):
+
+    def test_close(self):
+        pool = self.connection._connection = SFTPClientPool(PooledClient)
+        with self.connection:
+            client_context = self.connection._client()
+            client = client_context.__enter__()
+            with self.connection._client() as idle_client:
+                pass
+        self.assertIsNone(self.connection._connection)
+        self.assertTrue(idle_client.transport.closed)
+        # A client borrowed while closing is closed when it's released
+        self.assertFalse(client.transport.closed)
+        client_context.__exit__(None, None, None)
+        self.assertTrue(client.transport.closed)
+        self.assertTrue(pool._idle.empty())
+        self.connection.close()
+
+
+class TestSendDirectory(SSHConnectionTestCase):
+
+    def test_tar_children(self):
+        source = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, source, ignore_errors=True)
+        os.makedirs(os.path.join(source, 'dir'))
+        for name in ('a.txt', os.path.join('dir', 'b.txt')):
+            with open(os.path.join(source, name), 'wb') as file:
+                file.write(name.encode())
+        self.connection._remote_checks['command -v tar'] = True
+        created = []
+        self.connection.create_directory = \
+            lambda path, **kwargs: created.append(path.as_posix())
+
+        self.connection.send_directory(source, "it's here")
+        self.assertEqual(created, ["/work/it's here"])
+        channel, = self.client.channels
+        self.assertEqual(channel.command,
+                         "tar -x -o -f - -C '/work/it'\"'\"'s here'")
+        with tarfile.open(fileobj=BytesIO(channel.stdin.getvalue())
+                          ) as archive:
+            # The target directory itself isn't in the archive, so its
+            # mode and time are left as they are
+            self.assertEqual(sorted(archive.getnames()),
+                             ['a.txt', 'dir', 'dir/b.txt'])
+            self.assertEqual(archive.extractfile('dir/b.txt').read(),
+                             os.path.join('dir', 'b.txt').encode())
+
+    def test_failure(self):
+        source = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, source, ignore_errors=True)
+        self.connection._remote_checks['command -v tar'] = True
+        self.connection.create_directory = lambda path, **kwargs: None
+        self.client.results.append((2, b'', b'tar: cannot open\n'))
+        with self.assertRaises(NotPerformedException) as error:
+            self.connection.send_directory(source, 'target')
+        self.assertIn('tar: cannot open', str(error.exception))
+
+    def test_without_tar(self):
+        self.connection._remote_checks['command -v tar'] = False
+        with patch('src.rsс.connections.RemoteStorageConnection'
+                   '.send_directory') as send_directory:
+            self.connection.send_directory('source', 'target', True, 2)
+        send_directory.assert_called_once_with('source', 'target', True, 2)
+        self.assertFalse(self.client.channels)
+
+
+STAT_COMMAND = "stat -L -c '%s:%Y:%X:%f:%n' --"
+
+
+class TestStatMultiple(SSHConnectionTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.connection.stat_cache_ttl = 60
+        self.connection._remote_checks['stat -L -c %s /'] = True
+
+    def test_batched(self):
+        # The missing file makes stat fail, the others are still printed
+        self.client.results.append((1, (
+            "3:1600000000:1600000001:81a4:/work/a b.txt\n"
+            "4096:1600000002:1600000003:41ed:/work/it's\n"
+            "5:1600000004:1600000005:81a4:/work/odd:name: here\n"
+        ).encode(), b"stat: cannot stat '/work/missing'\n"))
+        found = self.connection.stat_multiple(
+            ['a b.txt', "it's", 'odd:name: here', 'missing'])
+
+        self.assertEqual(self.client.calls, [(
+            'exec', STAT_COMMAND + " '/work/a b.txt' '/work/it'\"'\"'s' "
+                                   "'/work/odd:name: here' /work/missing")])
+        first, second, third, missing = found
+        self.assertIsNone(missing)
+        self.assertEqual((first.name, first.size, first.type),
+                         ('a b.txt', 3, 'file'))
+        self.assertEqual(first.modification_time,
+                         datetime.fromtimestamp(1600000000))
+        self.assertEqual(first.last_access_time,
+                         datetime.fromtimestamp(1600000001))
+        self.assertEqual(first.absolute_path.as_posix(), '/work/a b.txt')
+        self.assertEqual((second.name, second.type), ("it's", 'directory'))
+        self.assertEqual((third.name, third.size), ('odd:name: here', 5))
+
+        # The results are cached
+        self.assertFalse(self.connection.file_exists('missing'))
+        self.assertEqual(self.connection.get_file_attributes('a b.txt'),
+                         first)
+        self.assertEqual(len(self.client.calls), 1)
+
+    def test_names_with_newlines(self):
+        self.client.files['/work/new\nline.txt'] = b'123'
+        self.client.results.append(
+            (0, b'1:1600000000:1600000001:81a4:/work/a.txt\n', b''))
+        a, newline, missing = self.connection.stat_multiple(
+            ['a.txt', 'new\nline.txt', 'missing\nfile.txt'])
+        self.assertEqual(self.client.calls[0],
+                         ('exec', STAT_COMMAND + ' /work/a.txt'))
+        self.assertNotIn('\n', self.client.calls[0][1])
+        self.assertEqual((a.name, a.size), ('a.txt', 1))
+        self.assertEqual((newline.name, newline.size), ('new\nline.txt', 3))
+        self.assertIsNone(missing)
+
+    def test_batches(self):
+        names = [f'{index:0200}' for index in range(1000)]
+        self.client.results.extend((0, b'', b'') for _ in range(10))
+        self.assertEqual(self.connection.stat_multiple(names),
+                         [None] * len(names))
+        commands = [call[1] for call in self.client.calls]
+        self.assertGreater(len(commands), 1)
+        self.assertTrue(all(len(command) <= _SSH_COMMAND_SIZE
+                            for command in commands))
+        self.assertEqual([argument for command in commands
+                          for argument in command.split()[5:]],
+                         [f'/work/{name}' for name in names])
+
+    def test_without_stat(self):
+        self.connection._remote_checks['stat -L -c %s /'] = False
+        self.client.directories.add('/work/dir')
+        directory, missing = self.connection.stat_multiple(['dir', 'missing'])
+        self.assertEqual(directory.type, 'directory')
+        self.assertIsNone(missing)
+        self.assertFalse(self.client.channels)
+
+
+class TestRemoveMultipleFiles(SSHConnectionTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.connection.stat_cache_ttl = 60
+        self.connection._remote_checks['command -v rm'] = True
+
+    def test_batched(self):
+        self.connection.remove_multiple_files(
+            ['a b.txt', "it's", '-rf', '$(x)', 'new\nline'])
+        self.assertEqual(self.client.calls, [(
+            'exec', "rm -f -- '/work/a b.txt' '/work/it'\"'\"'s' /work/-rf "
+                    "'/work/$(x)' '/work/new\nline'")])
+
+    def test_failure(self):
+        self.client.files['/work/a.txt'] = b'1'
+        self.assertTrue(self.connection.file_exists('a.txt'))
+        self.client.results.append(
+            (1, b'', b"rm: cannot remove '/work/a.txt': Permission denied"))
+        with self.assertRaises(NotPerformedException) as error:
+            self.connection.remove_multiple_files(['a.txt', 'b.txt'])
+        self.assertIn('Permission denied', str(error.exception))
+        # Nothing is known about the files after a partial failure
+        del self.client.calls[:]
+        self.assertTrue(self.connection.file_exists('a.txt'))
+        self.assertEqual(self.client.calls, [('stat', '/work/a.txt')])
+
+    def test_without_rm(self):
+        self.connection._remote_checks['command -v rm'] = False
+        self.client.files['/work/a.txt'] = b'1'
+        self.connection.remove_multiple_files(['a.txt', 'missing.txt'])
+        self.assertEqual(self.client.files, {})
+        self.assertEqual(self.client.calls, [
+            ('stat', '/work/a.txt'), ('remove', '/work/a.txt'),
+            ('stat', '/work/missing.txt')])
+        self.assertFalse(self.client.channels)
+
+
+class TestIfExistsAndIfMissing(SSHConnectionTestCase):
+
+    def test_delete_file_if_exists(self):
+        self.connection.stat_cache_ttl = 60
+        self.client.files['/work/a.txt'] = b'1'
+        self.assertTrue(self.connection.file_exists('a.txt'))
+        self.assertTrue(self.connection.delete_file_if_exists('a.txt'))
+        self.assertFalse(self.connection.delete_file_if_exists('a.txt'))
+        # No existence checks go first and the cache is updated
+        self.assertEqual(self.client.calls, [
+            ('stat', '/work/a.txt'), ('remove', '/work/a.txt'),
+            ('remove', '/work/a.txt')])
+        self.assertFalse(self.connection.file_exists('a.txt'))
+
+    def test_create_directory_if_missing(self):
+        self.assertTrue(self.connection.create_directory_if_missing('dir'))
+        self.assertEqual(self.client.calls, [('mkdir', '/work/dir', 0o777)])
+        del self.client.calls[:]
+        self.assertFalse(self.connection.create_directory_if_missing('dir'))
+        self.assertEqual(self.client.calls, [('mkdir', '/work/dir', 0o777),
+                                             ('stat', '/work/dir')])
+        with self.assertRaises(NotPerformedException):
+            self.connection.create_directory_if_missing('other', mode=800)
+
+
+class TestClientPool(TestCase):
+
+    def test_broken_clients(self):
+        pool = SFTPClientPool(PooledClient)
+        with pool.acquire() as client:
+            pass
+        # File errors don't break the client, transport ones do
+        with self.assertRaises(IOError), pool.acquire() as same_client:
+            raise IOError('No such file')
+        self.assertIs(same_client, client)
+        with self.assertRaises(paramiko.SSHException), \
+                pool.acquire() as same_client:
+            raise paramiko.SSHException()
+        self.assertIs(same_client, client)
+        self.assertTrue(client.transport.closed)
+        with pool.acquire() as new_client:
+            self.assertIsNot(new_client, client)
+
+    def test_dead_clients(self):
+        pool = SFTPClientPool(PooledClient, recycle=0)
+        with pool.acquire() as client:
+            pass
+        client.transport.active = False
+        with pool.acquire() as new_client:
+            self.assertIsNot(new_client, client)
+        self.assertTrue(client.transport.closed)
+
+    def test_open_client(self):
+        transport = SimpleNamespace(
+            connect=lambda **kwargs: calls.append(('connect', kwargs)),
+            set_keepalive=lambda interval: calls.append(('keepalive',
+                                                         interval)),
+            close=lambda: calls.append(('close',)))
+        for keepalive in (30, 0):
+            calls = []
+            with patch.object(paramiko, 'Transport',
+                              return_value=transport) as make_transport, \
+                    patch.object(paramiko.SFTPClient, 'from_transport',
+                                 return_value='client'):
+                self.assertEqual(SSHConnection._open_client(
+                    'host', 2222, 'user', 'password', keepalive,
+                    {'default_window_size': 1 << 20}), 'client')
+            make_transport.assert_called_once_with(
+                ('host', 2222), default_window_size=1 << 20)
+            self.assertEqual(calls[0], ('connect', {
+                'hostkey': None, 'username': 'user',
+                'password': 'password'}))
+            self.assertEqual(calls[1:],
+                             [('keepalive', 30)] if keepalive else [])
+
+        def refuse(**kwargs):
+            raise paramiko.SSHException('denied')
+
+        calls = []
+        transport.connect = refuse
+        with patch.object(paramiko, 'Transport', return_value=transport), \
+                self.assertRaises(ConnectionFailure):
+            SSHConnection._open_client('host', 22, 'user', 'password', 30,
+                                       {})
+        self.assertEqual(calls, [('close',)])